@@ -30,56 +30,29 @@ echo -e "${GREEN}✅ Flutter version:${NC}"
 flutter --version | head -1
 echo ""
 
-# Función para contar ocurrencias
-count_pattern() {
-    local pattern=$1
-    local description=$2
-    local count=$(grep -r "$pattern" lib/ 2>/dev/null | wc -l | tr -d ' ')
-    
-    if [ "$count" -gt 0 ]; then
-        echo -e "${YELLOW}⚠️  $description: $count occurrences${NC}"
-    else
-        echo -e "${GREEN}✅ $description: None found${NC}"
-    fi
-}
-
-# Análisis de código deprecado
+# Análisis de código deprecado: un solo pase con el analizador del servidor
+# (mismas reglas que RepositoryAnalyzer, sin levantar el servidor)
 echo -e "${BLUE}🔍 Scanning for deprecated patterns...${NC}"
 echo ""
 
-echo "## TextTheme Deprecated Properties:"
-count_pattern "headline[1-6]" "headline1-6"
-count_pattern "bodyText[1-2]" "bodyText1-2"
-count_pattern "subtitle[1-2]" "subtitle1-2"
-count_pattern "\.caption" "caption"
-count_pattern "button:" "button style"
-echo ""
-
-echo "## Button Style Deprecated Properties:"
-count_pattern "primary: Colors\." "primary color"
-count_pattern "onPrimary: Colors\." "onPrimary color"
-echo ""
-
-echo "## Widget Deprecations:"
-count_pattern "WillPopScope" "WillPopScope"
-count_pattern "ButtonBar" "ButtonBar"
-echo ""
+SERVER_DIR="$(cd ../server && pwd)"
+APP_LIB_DIR="$(pwd)/lib"
 
-echo "## AppBar Deprecations:"
-count_pattern "brightness: Brightness\." "brightness"
-echo ""
-
-echo "## Other Deprecations:"
-count_pattern "activeColor:" "activeColor"
-count_pattern "checkColor:" "checkColor"
-count_pattern "textColor:" "textColor (SnackBarAction)"
-count_pattern "\.withOpacity" "withOpacity"
-echo ""
+if ! command -v python3 &> /dev/null; then
+    echo -e "${RED}❌ python3 no está instalado${NC}"
+    exit 1
+fi
 
-# Contar total de problemas
-total=$(grep -r "headline[1-6]\|bodyText[1-2]\|subtitle[1-2]\|WillPopScope\|ButtonBar\|brightness: Brightness\.\|primary: Colors\.\|onPrimary: Colors\." lib/ 2>/dev/null | wc -l | tr -d ' ')
+(cd "$SERVER_DIR" && python3 -m cli "$APP_LIB_DIR")
+severity=$?
 
-echo -e "${BLUE}📊 Total deprecated patterns found: ${total}${NC}"
+case $severity in
+    0) echo -e "${GREEN}✅ Severity: Low${NC}" ;;
+    1) echo -e "${YELLOW}⚠️  Severity: Medium${NC}" ;;
+    2) echo -e "${YELLOW}⚠️  Severity: High${NC}" ;;
+    3) echo -e "${RED}❌ Severity: Critical${NC}" ;;
+    *) echo -e "${RED}❌ Analysis failed${NC}" ;;
+esac
 echo ""
 
 # Ejecutar flutter analyze
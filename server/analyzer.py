@@ -0,0 +1,688 @@
+#!/usr/bin/env python3
+"""
+Repository Analyzer
+Scans repositories for deprecated code patterns and computes the outdated score.
+"""
+
+import bisect
+import hashlib
+import json
+import math
+import os
+import re
+import time
+from collections import Counter
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Pattern, Sequence, Set, Tuple
+
+from config import ESTIMATE_DEADLINE_MS, ESTIMATE_MIN_SAMPLE_FILES
+from dart_blocks import find_call, hole_placeholder, in_code, non_code_spans
+from git_objects import GitCatFile, list_tree, list_tree_with_sizes, resolve_commit
+from match_cache import MatchCache
+from models import AnalysisResult, ConfidenceInterval, DeprecationPattern, DirectoryScore, PackageScore
+from rollup import ScoreRollup
+from sampling import sampling_order, stratified_estimate, stratum_key
+
+# Files read, looked up in the match cache and matched per scan batch
+SCAN_BATCH_SIZE = 1000
+
+# (RULES index, line, column) of a match, 1-based
+Match = Tuple[int, int, int]
+
+
+# Smallest unit a rule's fix rewrites, see Rule.scope
+LINE_SCOPE = "line"
+BLOCK_SCOPE = "block"
+FILE_SCOPE = "file"
+
+
+class Rule(NamedTuple):
+    """A deprecated code pattern."""
+    # Stable identifier, unique across RULE_PACKS (reported as the SARIF rule id)
+    id: str
+    pattern: str
+    description: str
+    # Languages the rule applies to, see RepositoryAnalyzer.LANGUAGE_EXTENSIONS
+    languages: Set[str]
+    # LINE_SCOPE: the matching line; BLOCK_SCOPE: the constructor call starting at
+    # the match; FILE_SCOPE: edits elsewhere in the file too (e.g. imports)
+    scope: str = LINE_SCOPE
+
+
+class ScanResult(NamedTuple):
+    """Result of RepositoryAnalyzer.scan."""
+    analysis: AnalysisResult
+    matches: Dict[str, List[Match]]
+    cache_hits: int
+
+
+# Per-process analyzer of ProcessPoolExecutor workers, see RepositoryAnalyzer.scan
+_worker_analyzer = None
+
+
+def _init_scan_worker(repo_path: str):
+    global _worker_analyzer
+    _worker_analyzer = RepositoryAnalyzer(repo_path)
+
+
+def _find_matches_chunk(chunk: List[Tuple[str, str]]) -> List[List[Match]]:
+    return [_worker_analyzer.find_matches(path, content) for path, content in chunk]
+
+
+class RepositoryAnalyzer:
+    """Analyzes repositories for deprecated code patterns."""
+
+    # Flutter/Dart deprecated patterns
+    FLUTTER_PATTERNS = [
+        Rule('flutter/text-theme-headline', r'headline[1-6]', 'TextTheme.headline1-6 (use displayLarge, headlineLarge, etc.)', {'dart'}),
+        Rule('flutter/text-theme-body-text', r'bodyText[1-2]', 'TextTheme.bodyText1-2 (use bodyLarge, bodyMedium)', {'dart'}),
+        Rule('flutter/text-theme-subtitle', r'subtitle[1-2]', 'TextTheme.subtitle1-2 (use titleLarge, titleMedium)', {'dart'}),
+        Rule('flutter/text-theme-caption', r'\.caption\b', 'TextTheme.caption (use bodySmall)', {'dart'}),
+        Rule('flutter/button-style-primary', r'\bprimary:\s*Colors\.', 'ButtonStyle.primary (use backgroundColor)', {'dart'}),
+        Rule('flutter/button-style-on-primary', r'\bonPrimary:\s*Colors\.', 'ButtonStyle.onPrimary (use foregroundColor)', {'dart'}),
+        Rule('flutter/will-pop-scope', r'\bWillPopScope\b', 'WillPopScope widget (use PopScope)', {'dart'}, BLOCK_SCOPE),
+        Rule('flutter/button-bar', r'\bButtonBar\b', 'ButtonBar widget (use OverflowBar)', {'dart'}, BLOCK_SCOPE),
+        Rule('flutter/app-bar-brightness', r'brightness:\s*Brightness\.', 'AppBar.brightness (use systemOverlayStyle)', {'dart'}, FILE_SCOPE),
+        Rule('flutter/active-color', r'\bactiveColor:', 'activeColor property (deprecated in Flutter 3.0)', {'dart'}),
+        Rule('flutter/check-color', r'\bcheckColor:', 'checkColor property (deprecated in Flutter 3.0)', {'dart'}),
+    ]
+
+    # All rule packs that are matched; add packs for other ecosystems here
+    RULE_PACKS = [FLUTTER_PATTERNS]
+    RULES = [rule for pack in RULE_PACKS for rule in pack]
+
+    # File extensions of each language a rule can target
+    LANGUAGE_EXTENSIONS = {
+        'dart': ['.dart'],
+        'python': ['.py'],
+        'javascript': ['.js'],
+        'typescript': ['.ts'],
+        'java': ['.java'],
+        'kotlin': ['.kt'],
+    }
+
+    # File marking a directory as a package root
+    PACKAGE_MANIFEST = 'pubspec.yaml'
+
+    # Common directories to ignore
+    IGNORE_DIRS = {'.git', 'node_modules', 'build', 'dist', '.dart_tool', 'android', 'ios', 'linux', 'macos', 'windows', 'web'}
+
+    def __init__(self, repo_path: str, ref: Optional[str] = None):
+        """
+        Initialize analyzer with repository path.
+
+        Args:
+            repo_path: Path to the repository to analyze
+            ref: Optional branch, tag or commit of a local git repository. When
+                given, files are read from the git object database instead of
+                the working tree, so no checkout is needed.
+        """
+        self.repo_path = Path(repo_path)
+        if not self.repo_path.exists():
+            raise ValueError(f"Repository path does not exist: {repo_path}")
+        if not self.repo_path.is_dir():
+            raise ValueError(f"Path is not a directory: {repo_path}")
+
+        self.ref = ref
+        self.commit = resolve_commit(repo_path, ref) if ref else None
+        self._dispatch = self.build_dispatch_table()
+
+    @classmethod
+    def build_dispatch_table(cls) -> Dict[str, List[Tuple[int, Pattern]]]:
+        """Map each file extension to the (RULES index, compiled regex) of its applicable rules."""
+        dispatch: Dict[str, List[Tuple[int, Pattern]]] = {}
+        for index, rule in enumerate(cls.RULES):
+            regex = re.compile(rule.pattern)
+            for language in sorted(rule.languages):
+                for ext in cls.LANGUAGE_EXTENSIONS.get(language, []):
+                    dispatch.setdefault(ext, []).append((index, regex))
+        return dispatch
+
+    @classmethod
+    def rules_fingerprint(cls) -> str:
+        """Hash of the rules and their routing, so cached matches are dropped when either changes."""
+        material = json.dumps({
+            "rules": [[rule.pattern, rule.description, sorted(rule.languages)] for rule in cls.RULES],
+            "extensions": cls.LANGUAGE_EXTENSIONS
+        }, sort_keys=True)
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def is_code_path(self, relative_path: str) -> bool:
+        """Check whether a repository-relative path is a code file that should be scanned."""
+        parts = Path(relative_path).parts
+        # Only files with at least one applicable rule are worth reading
+        if not parts or Path(parts[-1]).suffix not in self._dispatch:
+            return False
+        return not any(part in self.IGNORE_DIRS for part in parts[:-1])
+
+    def _walk_tree(
+        self,
+        with_sizes: bool = False,
+        deadline: Optional[float] = None
+    ) -> Tuple[List[Tuple[str, int]], List[str]]:
+        """
+        Walk the working tree once with os.scandir, pruning ignored directories.
+
+        Sizes are read from the scandir entries. Once the monotonic `deadline`
+        passes, sizes are no longer read and every size is reported as 0, so
+        callers stratifying by size fall back to directories alone.
+
+        Returns:
+            Tuple of (list of (repository-relative path, size in bytes or 0),
+            repository-relative package root directories)
+        """
+        code_files: List[Tuple[str, int]] = []
+        package_roots: List[str] = []
+        sized = with_sizes
+
+        def walk(directory: str, relative: str):
+            nonlocal sized
+            try:
+                with os.scandir(directory) as it:
+                    entries = sorted(it, key=lambda entry: entry.name)
+            except OSError:
+                return
+
+            subdirectories = []
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if is_dir:
+                    # Like os.walk, symlinked directories are not followed
+                    if entry.name not in self.IGNORE_DIRS and not entry.is_symlink():
+                        subdirectories.append(entry)
+                    continue
+
+                if entry.name == self.PACKAGE_MANIFEST:
+                    package_roots.append(Path(relative).as_posix() if relative else ".")
+                if os.path.splitext(entry.name)[1] not in self._dispatch:
+                    continue
+
+                size = 0
+                if sized:
+                    if deadline is not None and time.monotonic() >= deadline:
+                        sized = False
+                    else:
+                        try:
+                            size = entry.stat().st_size
+                        except OSError:
+                            pass
+                code_files.append((os.path.join(relative, entry.name), size))
+
+            for entry in subdirectories:
+                walk(entry.path, os.path.join(relative, entry.name))
+
+        walk(str(self.repo_path), "")
+        if with_sizes and not sized:
+            code_files = [(path, 0) for path, _ in code_files]
+        return code_files, package_roots
+
+    def _read_file(self, file_path: Path) -> str:
+        """Read a file's content, returning an empty string if it cannot be read."""
+        try:
+            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+                return f.read()
+        except Exception:
+            return ""
+
+    def _list_files(
+        self,
+        with_sizes: bool = False,
+        deadline: Optional[float] = None
+    ) -> Tuple[List[Tuple[str, int, Optional[str]]], List[str]]:
+        """
+        List every code file and package root of the working tree or ref.
+
+        Args:
+            with_sizes: Also report file sizes
+            deadline: Monotonic time after which working tree sizes are no
+                longer read (see _walk_tree)
+
+        Returns:
+            Tuple of (list of (repository-relative path, size in bytes or 0,
+            blob SHA or None), list of repository-relative package root directories)
+        """
+        if self.commit is None:
+            code_files, package_roots = self._walk_tree(with_sizes, deadline)
+            return [(path, size, None) for path, size in code_files], package_roots
+
+        if with_sizes:
+            entries = list_tree_with_sizes(str(self.repo_path), self.commit)
+        else:
+            entries = [(sha, path, 0) for sha, path in list_tree(str(self.repo_path), self.commit)]
+
+        files = []
+        package_roots = []
+        for sha, path, size in entries:
+            parts = Path(path).parts
+            if parts[-1] == self.PACKAGE_MANIFEST and not any(part in self.IGNORE_DIRS for part in parts[:-1]):
+                package_roots.append(Path(path).parent.as_posix())
+            elif self.is_code_path(path):
+                files.append((path, size, sha))
+        return files, package_roots
+
+    @contextmanager
+    def _content_reader(self) -> Iterator[Callable[[str, Optional[str]], str]]:
+        """Yield a function reading a listed file's content from the working tree or object database."""
+        if self.commit is None:
+            yield lambda path, sha: self._read_file(self.repo_path / path)
+            return
+
+        with GitCatFile(str(self.repo_path)) as cat_file:
+            yield lambda path, sha: cat_file.read(sha).decode('utf-8', errors='ignore')
+
+    def _iter_file_contents(self) -> Iterator[Tuple[str, str]]:
+        """Yield (repository-relative path, content) for every code file."""
+        files, _ = self._list_files()
+        with self._content_reader() as read:
+            for path, _, sha in files:
+                yield path, read(path, sha)
+
+    def applicable_rules(self, relative_path: str) -> List[Tuple[int, Pattern]]:
+        """Return the (RULES index, compiled regex) of the rules that apply to a file."""
+        return self._dispatch.get(Path(relative_path).suffix, [])
+
+    def count_patterns(self, relative_path: str, content: str) -> List[int]:
+        """Count occurrences of every rule in a file's content, in RULES order."""
+        counts = [0] * len(self.RULES)
+        for index, regex in self.applicable_rules(relative_path):
+            counts[index] = len(regex.findall(content))
+        return counts
+
+    def find_matches(self, relative_path: str, content: str) -> List[Match]:
+        """Locate every match of the rules applicable to a file, ordered by position."""
+        line_starts = None
+        matches = []
+        for index, regex in self.applicable_rules(relative_path):
+            for match in regex.finditer(content):
+                if line_starts is None:
+                    line_starts = [0] + [newline.end() for newline in re.finditer('\n', content)]
+                line = bisect.bisect_right(line_starts, match.start())
+                matches.append((index, line, match.start() - line_starts[line - 1] + 1))
+        matches.sort(key=lambda m: (m[1], m[2], m[0]))
+        return matches
+
+    @staticmethod
+    def calculate_score(total_deprecations: int, total_files: int) -> float:
+        """Calculate outdated score (0-100, where 100 is most outdated)."""
+        # Base score on number of deprecations per file
+        deprecations_per_file = float(total_deprecations) / total_files
+        # Scale: 0 deprecations = 0 score, 10+ deprecations per file = 100 score
+        return min(100.0, deprecations_per_file * 10)
+
+    @staticmethod
+    def determine_severity(outdated_score: float) -> str:
+        """Map an outdated score to a severity level."""
+        if outdated_score < 20:
+            return "Low"
+        elif outdated_score < 50:
+            return "Medium"
+        elif outdated_score < 80:
+            return "High"
+        else:
+            return "Critical"
+
+    @staticmethod
+    def build_recommendations(total_deprecations: int, outdated_score: float) -> List[str]:
+        """Generate recommendations for an analysis result."""
+        recommendations = []
+        if total_deprecations > 0:
+            recommendations.append("Run automated migration tools (e.g., 'dart fix --apply' for Flutter)")
+            recommendations.append("Review and update deprecated API usage")
+
+        if outdated_score > 50:
+            recommendations.append("Consider updating to latest framework version")
+            recommendations.append("Plan a comprehensive migration strategy")
+
+        if not recommendations:
+            recommendations.append("Code appears to be up-to-date")
+
+        return recommendations
+
+    def build_result(self, total_files: int, pattern_counts: Sequence[int]) -> AnalysisResult:
+        """Build an AnalysisResult from per-pattern totals."""
+        deprecated_patterns = []
+        total_deprecations = 0
+
+        for rule, count in zip(self.RULES, pattern_counts):
+            if count > 0:
+                deprecated_patterns.append(DeprecationPattern(
+                    pattern=rule.pattern,
+                    description=rule.description,
+                    count=count
+                ))
+                total_deprecations += count
+
+        outdated_score = self.calculate_score(total_deprecations, total_files)
+
+        return AnalysisResult(
+            repository_path=str(self.repo_path),
+            ref=self.ref,
+            commit=self.commit,
+            total_files_analyzed=total_files,
+            deprecated_patterns=deprecated_patterns,
+            total_deprecations=total_deprecations,
+            outdated_score=round(outdated_score, 2),
+            severity=self.determine_severity(outdated_score),
+            recommendations=self.build_recommendations(total_deprecations, outdated_score)
+        )
+
+    def file_occurrences(self, relative_path: str, content: str) -> List[Dict]:
+        """
+        Find every deprecated occurrence in a file's content.
+
+        Matches of BLOCK_SCOPE rules become one occurrence per constructor call,
+        whose snippet is the call with the base indentation removed and its
+        child arguments replaced by placeholders; a match that is not a call in
+        code (e.g. in a comment) falls back to its line. Every other match is
+        reported per line, with scope FILE_SCOPE if a FILE_SCOPE rule matched.
+        """
+        occurrences = []
+        line_rules = []
+        fallback_lines: Dict[int, List[int]] = {}
+        line_starts = None
+        spans = None
+
+        for index, regex in self.applicable_rules(relative_path):
+            rule = self.RULES[index]
+            if rule.scope != BLOCK_SCOPE:
+                line_rules.append((index, regex))
+                continue
+
+            for match in regex.finditer(content):
+                if line_starts is None:
+                    line_starts = [0] + [i + 1 for i, c in enumerate(content) if c == '\n']
+                    spans = non_code_spans(content)
+                line_number = bisect.bisect_right(line_starts, match.start())
+
+                block = find_call(content, match.start(), match.end()) if in_code(spans, match.start()) else None
+                if block is None:
+                    fallback_lines.setdefault(line_number, []).append(index)
+                    continue
+
+                line_start = line_starts[line_number - 1]
+                prefix = content[line_start:block.start]
+                indent = prefix[:len(prefix) - len(prefix.lstrip())]
+                template = []
+                position = block.start
+                for number, (hole_start, hole_end) in enumerate(block.holes):
+                    template += [content[position:hole_start], hole_placeholder(number)]
+                    position = hole_end
+                template.append(content[position:block.end])
+                snippet = "".join(template).replace("\n" + indent, "\n")
+
+                occurrences.append({
+                    "file": relative_path,
+                    "line": line_number,
+                    "scope": BLOCK_SCOPE,
+                    "snippet": snippet,
+                    "source": content[block.start:block.end],
+                    "start": block.start,
+                    "end": block.end,
+                    "holes": [list(hole) for hole in block.holes],
+                    "indent": indent,
+                    "patterns": [rule.pattern],
+                    "descriptions": [rule.description]
+                })
+
+        for line_number, line in enumerate(content.splitlines(), 1):
+            matched = [index for index, regex in line_rules if regex.search(line)]
+            matched += fallback_lines.get(line_number, [])
+            if matched:
+                rules = [self.RULES[index] for index in sorted(matched)]
+                occurrences.append({
+                    "file": relative_path,
+                    "line": line_number,
+                    "scope": FILE_SCOPE if any(rule.scope == FILE_SCOPE for rule in rules) else LINE_SCOPE,
+                    "snippet": line,
+                    "patterns": [rule.pattern for rule in rules],
+                    "descriptions": [rule.description for rule in rules]
+                })
+
+        return occurrences
+
+    def find_occurrences(self) -> List[Dict]:
+        """Find every deprecated occurrence in the repository (see file_occurrences)."""
+        occurrences = []
+        for relative_path, content in self._iter_file_contents():
+            occurrences.extend(self.file_occurrences(relative_path, content))
+        return occurrences
+
+    def analyze_occurrences(self) -> Tuple[AnalysisResult, List[Dict]]:
+        """Analyze the repository and find every deprecated occurrence in the same pass."""
+        files, _ = self._list_files()
+        if not files:
+            raise ValueError("No code files found in repository (required for score calculation)")
+
+        pattern_counts = [0] * len(self.RULES)
+        occurrences = []
+        with self._content_reader() as read:
+            for path, _, sha in files:
+                content = read(path, sha)
+                for index, count in enumerate(self.count_patterns(path, content)):
+                    pattern_counts[index] += count
+                occurrences.extend(self.file_occurrences(path, content))
+
+        return self.build_result(len(files), pattern_counts), occurrences
+
+    def analyze(self, rollup: bool = False) -> AnalysisResult:
+        """
+        Perform full analysis of the repository.
+
+        Args:
+            rollup: Also score every package (directory with a pubspec.yaml) and
+                directory, from the same single pass over the files
+        """
+        files, package_roots = self._list_files()
+        if not files:
+            raise ValueError("No code files found in repository (required for score calculation)")
+
+        score_rollup = ScoreRollup(package_roots) if rollup else None
+
+        # Read each file once and match every pattern against its content
+        pattern_counts = [0] * len(self.RULES)
+        with self._content_reader() as read:
+            for path, _, sha in files:
+                counts = self.count_patterns(path, read(path, sha))
+                for index, count in enumerate(counts):
+                    pattern_counts[index] += count
+                if score_rollup is not None:
+                    score_rollup.add_file(path, sum(counts))
+
+        result = self.build_result(len(files), pattern_counts)
+        if score_rollup is not None:
+            result.packages, result.directory_tree = self._build_rollup(score_rollup)
+        return result
+
+    def _build_rollup(self, score_rollup: ScoreRollup) -> Tuple[List[PackageScore], DirectoryScore]:
+        """Score the packages (worst first) and the directory tree of a rollup."""
+        def scores(files: int, deprecations: int) -> Dict:
+            outdated_score = self.calculate_score(deprecations, files)
+            return {
+                "total_files_analyzed": files,
+                "total_deprecations": deprecations,
+                "outdated_score": round(outdated_score, 2),
+                "severity": self.determine_severity(outdated_score)
+            }
+
+        packages = [
+            PackageScore(path=path, **scores(files, deprecations))
+            for path, (files, deprecations) in score_rollup.packages.items()
+        ]
+        packages.sort(key=lambda package: (-package.outdated_score, package.path))
+
+        children = score_rollup.children()
+
+        def directory_node(path: str) -> DirectoryScore:
+            files, deprecations = score_rollup.directories[path]
+            return DirectoryScore(
+                path=path,
+                is_package=path in score_rollup.package_roots,
+                children=[directory_node(child) for child in children[path]],
+                **scores(files, deprecations)
+            )
+
+        return packages, directory_node(ScoreRollup.ROOT)
+
+    def estimate(
+        self,
+        deadline_ms: Optional[int] = None,
+        sample_fraction: Optional[float] = None,
+        seed: int = 0
+    ) -> AnalysisResult:
+        """
+        Estimate the analysis from a stratified sample of files.
+
+        Files are stratified by leading directories and size, then sampled in an
+        order where every prefix is proportionally stratified. Sampling stops
+        after `sample_fraction` of the files or at the deadline, whichever comes
+        first (but never before ESTIMATE_MIN_SAMPLE_FILES files), and totals are
+        extrapolated with a 95% confidence interval.
+
+        Listing the files counts against the deadline. Every file must be listed
+        to know the population. If the deadline passes while listing, file sizes
+        are dropped from the strata and only the minimum sample is read.
+
+        Args:
+            deadline_ms: Time budget in milliseconds, measured from the call
+            sample_fraction: Fraction of files to sample (0 < fraction <= 1)
+            seed: Seed for the random sampling order
+
+        Returns:
+            AnalysisResult flagged as approximate unless every file was read
+        """
+        started = time.monotonic()
+        if deadline_ms is None and sample_fraction is None:
+            deadline_ms = ESTIMATE_DEADLINE_MS
+        if sample_fraction is not None and not 0 < sample_fraction <= 1:
+            raise ValueError("sample_fraction must be greater than 0 and at most 1")
+        deadline = started + deadline_ms / 1000 if deadline_ms is not None else None
+
+        files, _ = self._list_files(with_sizes=True, deadline=deadline)
+        if not files:
+            raise ValueError("No code files found in repository (required for score calculation)")
+
+        def key(file):
+            return stratum_key(file[0], file[1])
+
+        order = sampling_order(files, key, seed)
+        if sample_fraction is not None:
+            order = order[:max(ESTIMATE_MIN_SAMPLE_FILES, math.ceil(sample_fraction * len(order)))]
+
+        samples: Dict[Tuple[str, int], List[List[int]]] = {}
+        deadline_reached = False
+        with self._content_reader() as read:
+            for position, file in enumerate(order):
+                # A minimum sample is always read so the interval is meaningful
+                if (position >= ESTIMATE_MIN_SAMPLE_FILES and deadline is not None
+                        and time.monotonic() >= deadline):
+                    deadline_reached = True
+                    break
+                path, _, sha = file
+                samples.setdefault(key(file), []).append(self.count_patterns(path, read(path, sha)))
+
+        files_sampled = sum(len(stratum) for stratum in samples.values())
+        population = Counter(key(file) for file in files)
+        estimate = stratified_estimate(population, samples, len(self.RULES))
+
+        result = self.build_result(len(files), [round(total) for total in estimate.pattern_totals])
+        result.approximate = files_sampled < len(files)
+        result.files_sampled = files_sampled
+        result.deadline_reached = deadline_reached
+        result.confidence_interval = ConfidenceInterval(
+            confidence_level=0.95,
+            total_deprecations_low=round(estimate.low, 2),
+            total_deprecations_high=round(estimate.high, 2),
+            outdated_score_low=round(self.calculate_score(estimate.low, len(files)), 2),
+            outdated_score_high=round(self.calculate_score(estimate.high, len(files)), 2)
+        )
+        return result
+
+    def scan(self, workers: int = 1, match_cache: Optional[MatchCache] = None) -> ScanResult:
+        """
+        Locate every match in one pass over the files, in parallel and with a persistent cache.
+
+        Files are read in batches; each file's matches are looked up in the
+        match cache by content hash and only misses are matched, across
+        `workers` processes when more than one is requested.
+
+        Args:
+            workers: Number of matching processes (1 matches in-process)
+            match_cache: Optional cache of per-file matches shared between runs
+
+        Returns:
+            ScanResult with the analysis, the matches of every file and the cache hit count
+        """
+        files, _ = self._list_files()
+        if not files:
+            raise ValueError("No code files found in repository (required for score calculation)")
+
+        fingerprint = self.rules_fingerprint()
+        matches: Dict[str, List[Match]] = {}
+        cache_hits = 0
+
+        executor = None
+        if workers > 1:
+            executor = ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_scan_worker,
+                initargs=(str(self.repo_path),)
+            )
+        try:
+            with self._content_reader() as read:
+                for start in range(0, len(files), SCAN_BATCH_SIZE):
+                    batch = [(path, read(path, sha)) for path, _, sha in files[start:start + SCAN_BATCH_SIZE]]
+
+                    keys: Dict[str, str] = {}
+                    cached: Dict[str, str] = {}
+                    if match_cache is not None:
+                        keys = {path: MatchCache.make_key(fingerprint, path, content) for path, content in batch}
+                        cached = match_cache.get_many(keys.values())
+
+                    misses = []
+                    for path, content in batch:
+                        value = cached.get(keys.get(path))
+                        if value is not None:
+                            matches[path] = [tuple(match) for match in json.loads(value)]
+                            cache_hits += 1
+                        else:
+                            misses.append((path, content))
+
+                    for (path, _), found in zip(misses, self._find_matches_many(misses, executor, workers)):
+                        matches[path] = found
+
+                    if match_cache is not None:
+                        match_cache.put_many([(keys[path], json.dumps(matches[path])) for path, _ in misses])
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        pattern_counts = [0] * len(self.RULES)
+        for file_matches in matches.values():
+            for index, _, _ in file_matches:
+                pattern_counts[index] += 1
+
+        return ScanResult(
+            analysis=self.build_result(len(files), pattern_counts),
+            matches=matches,
+            cache_hits=cache_hits
+        )
+
+    def _find_matches_many(
+        self,
+        files: List[Tuple[str, str]],
+        executor: Optional[Executor],
+        workers: int
+    ) -> List[List[Match]]:
+        """Match (path, content) pairs in-process or spread over an executor."""
+        if executor is None or len(files) < 2:
+            return [self.find_matches(path, content) for path, content in files]
+
+        # A few chunks per worker balances load without pickling every file separately
+        chunk_size = max(1, math.ceil(len(files) / (workers * 4)))
+        chunks = [files[start:start + chunk_size] for start in range(0, len(files), chunk_size)]
+        return [found for chunk in executor.map(_find_matches_chunk, chunks) for found in chunk]
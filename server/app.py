@@ -5,17 +5,22 @@ Analyzes repositories for deprecated code patterns and provides a score
 indicating how outdated the codebase is.
 """
 
-import re
-from pathlib import Path
-from typing import List, Optional
 from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel, Field
 import uvicorn
 from contextlib import asynccontextmanager
 
-# Import migration agent and config
+# Import migration agent, analyzers and models
 from migration_agent import get_migration_agent, shutdown_migration_agent
-from config import DEFAULT_MODEL
+from analyzer import RepositoryAnalyzer
+from history import HistoryAnalyzer
+from models import (
+    RepositoryRequest,
+    AnalysisResult,
+    MigrationRequest,
+    MigrationResult,
+    HistoryRequest,
+    HistoryResult
+)
 
 
 @asynccontextmanager
@@ -43,164 +48,6 @@ app = FastAPI(
 )
 
 
-class RepositoryRequest(BaseModel):
-    """Request model for repository analysis."""
-    path: str = Field(..., description="Absolute path to the repository to analyze")
-
-
-class DeprecationPattern(BaseModel):
-    """Model for a deprecated code pattern."""
-    pattern: str
-    description: str
-    count: int
-
-
-class AnalysisResult(BaseModel):
-    """Result of repository analysis."""
-    repository_path: str
-    total_files_analyzed: int
-    deprecated_patterns: List[DeprecationPattern]
-    total_deprecations: int
-    outdated_score: float
-    severity: str
-    recommendations: List[str]
-
-
-class MigrationRequest(BaseModel):
-    """Request model for repository migration."""
-    path: str = Field(..., description="Absolute path to the repository to migrate")
-    model: Optional[str] = Field(DEFAULT_MODEL, description="LLM model to use for migration")
-
-
-class MigrationResult(BaseModel):
-    """Result of repository migration."""
-    success: bool
-    message: str
-    repo_path: Optional[str] = None
-    changes: List[str]
-    migration_log: Optional[List[dict]] = None
-    error: Optional[str] = None
-
-
-class RepositoryAnalyzer:
-    """Analyzes repositories for deprecated code patterns."""
-    
-    # Flutter/Dart deprecated patterns
-    FLUTTER_PATTERNS = [
-        (r'headline[1-6]', 'TextTheme.headline1-6 (use displayLarge, headlineLarge, etc.)'),
-        (r'bodyText[1-2]', 'TextTheme.bodyText1-2 (use bodyLarge, bodyMedium)'),
-        (r'subtitle[1-2]', 'TextTheme.subtitle1-2 (use titleLarge, titleMedium)'),
-        (r'\.caption\b', 'TextTheme.caption (use bodySmall)'),
-        (r'\bprimary:\s*Colors\.', 'ButtonStyle.primary (use backgroundColor)'),
-        (r'\bonPrimary:\s*Colors\.', 'ButtonStyle.onPrimary (use foregroundColor)'),
-        (r'\bWillPopScope\b', 'WillPopScope widget (use PopScope)'),
-        (r'\bButtonBar\b', 'ButtonBar widget (use OverflowBar)'),
-        (r'brightness:\s*Brightness\.', 'AppBar.brightness (use systemOverlayStyle)'),
-        (r'\bactiveColor:', 'activeColor property (deprecated in Flutter 3.0)'),
-        (r'\bcheckColor:', 'checkColor property (deprecated in Flutter 3.0)'),
-    ]
-    
-    def __init__(self, repo_path: str):
-        """Initialize analyzer with repository path."""
-        self.repo_path = Path(repo_path)
-        if not self.repo_path.exists():
-            raise ValueError(f"Repository path does not exist: {repo_path}")
-        if not self.repo_path.is_dir():
-            raise ValueError(f"Path is not a directory: {repo_path}")
-    
-    def _find_code_files(self, extensions: List[str] = None) -> List[Path]:
-        """Find code files in the repository."""
-        if extensions is None:
-            extensions = ['.dart', '.py', '.js', '.ts', '.java', '.kt']
-        
-        code_files = []
-        for ext in extensions:
-            code_files.extend(self.repo_path.rglob(f'*{ext}'))
-        
-        # Filter out common directories to ignore
-        ignore_dirs = {'.git', 'node_modules', 'build', 'dist', '.dart_tool', 'android', 'ios', 'linux', 'macos', 'windows', 'web'}
-        
-        filtered_files = []
-        for file_path in code_files:
-            if not any(ignored in file_path.parts for ignored in ignore_dirs):
-                filtered_files.append(file_path)
-        
-        return filtered_files
-    
-    def _count_pattern_in_file(self, file_path: Path, pattern: str) -> int:
-        """Count occurrences of a pattern in a file."""
-        try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-                matches = re.findall(pattern, content)
-                return len(matches)
-        except Exception:
-            return 0
-    
-    def analyze(self) -> AnalysisResult:
-        """Perform full analysis of the repository."""
-        code_files = self._find_code_files()
-        
-        if not code_files:
-            raise ValueError("No code files found in repository (required for score calculation)")
-        
-        # Analyze patterns
-        deprecated_patterns = []
-        total_deprecations = 0
-        
-        for pattern, description in self.FLUTTER_PATTERNS:
-            count = 0
-            for file_path in code_files:
-                count += self._count_pattern_in_file(file_path, pattern)
-            
-            if count > 0:
-                deprecated_patterns.append(DeprecationPattern(
-                    pattern=pattern,
-                    description=description,
-                    count=count
-                ))
-                total_deprecations += count
-        
-        # Calculate outdated score (0-100, where 100 is most outdated)
-        # Base score on number of deprecations per file
-        deprecations_per_file = float(total_deprecations) / len(code_files)
-        # Scale: 0 deprecations = 0 score, 10+ deprecations per file = 100 score
-        outdated_score = min(100.0, deprecations_per_file * 10)
-        
-        # Determine severity
-        if outdated_score < 20:
-            severity = "Low"
-        elif outdated_score < 50:
-            severity = "Medium"
-        elif outdated_score < 80:
-            severity = "High"
-        else:
-            severity = "Critical"
-        
-        # Generate recommendations
-        recommendations = []
-        if total_deprecations > 0:
-            recommendations.append("Run automated migration tools (e.g., 'dart fix --apply' for Flutter)")
-            recommendations.append("Review and update deprecated API usage")
-            
-        if outdated_score > 50:
-            recommendations.append("Consider updating to latest framework version")
-            recommendations.append("Plan a comprehensive migration strategy")
-        
-        if not recommendations:
-            recommendations.append("Code appears to be up-to-date")
-        
-        return AnalysisResult(
-            repository_path=str(self.repo_path),
-            total_files_analyzed=len(code_files),
-            deprecated_patterns=deprecated_patterns,
-            total_deprecations=total_deprecations,
-            outdated_score=round(outdated_score, 2),
-            severity=severity,
-            recommendations=recommendations
-        )
-
-
 @app.get("/")
 async def root():
     """Root endpoint with API information."""
@@ -210,6 +57,7 @@ async def root():
         "endpoints": {
             "/analyze": "POST - Analyze a repository",
             "/migrate": "POST - Migrate a repository using Copilot AI",
+            "/history": "POST - Outdated score across a repository's git history",
             "/health": "GET - Health check"
         }
     }
@@ -231,10 +79,32 @@ async def analyze_repository(request: RepositoryRequest):
     - 20-50: Medium amount of deprecated code
     - 50-80: High amount of deprecated code
     - 80-100: Critical amount of deprecated code
+    
+    When `ref` is given, `path` must be a local git repository and the files
+    of that branch, tag or commit are read from the object database without
+    a checkout.
+    
+    With `mode="estimate"`, a stratified sample of files is scanned until
+    `sample_fraction` is reached or `deadline_ms` expires, and the totals and
+    score are extrapolated with a 95% confidence interval. The result is
+    flagged `approximate` unless every file was read.
+    
+    With `rollup=true` (full mode only), the same pass also returns a score
+    for every package (directory with a pubspec.yaml, counting the files
+    whose nearest package it is), worst first, and a directory tree with
+    the score of each directory's subtree.
     """
     try:
-        analyzer = RepositoryAnalyzer(request.path)
-        result = analyzer.analyze()
+        analyzer = RepositoryAnalyzer(request.path, ref=request.ref)
+        if request.mode == "estimate":
+            if request.rollup:
+                raise ValueError("rollup is only supported in full mode")
+            result = analyzer.estimate(
+                deadline_ms=request.deadline_ms,
+                sample_fraction=request.sample_fraction
+            )
+        else:
+            result = analyzer.analyze(rollup=request.rollup)
         return result
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -242,6 +112,25 @@ async def analyze_repository(request: RepositoryRequest):
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
 
+@app.post("/history", response_model=HistoryResult)
+async def repository_history(request: HistoryRequest):
+    """
+    Backfill the outdated score across a repository's git history.
+    
+    Scores the most recent `max_commits` first-parent commits of `ref` straight
+    from the git object database (no checkouts). Each unique file version is
+    matched only once, so the cost scales with the number of distinct blobs
+    rather than commits × files.
+    """
+    try:
+        analyzer = HistoryAnalyzer(request.path)
+        return analyzer.analyze(ref=request.ref, max_commits=request.max_commits)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"History analysis failed: {str(e)}")
+
+
 @app.post("/migrate", response_model=MigrationResult)
 async def migrate_repository(request: MigrationRequest):
     """
@@ -258,9 +147,9 @@ async def migrate_repository(request: MigrationRequest):
     - See: https://docs.github.com/en/copilot/copilot-cli
     """
     try:
-        # First analyze to get deprecations
+        # First analyze to get deprecations, locating each occurrence in the same pass
         analyzer = RepositoryAnalyzer(request.path)
-        analysis = analyzer.analyze()
+        analysis, occurrences = analyzer.analyze_occurrences()
         
         if analysis.total_deprecations == 0:
             return MigrationResult(
@@ -287,7 +176,8 @@ async def migrate_repository(request: MigrationRequest):
         result = await agent.migrate_repository(
             repo_path=request.path,
             deprecations=[p.dict() for p in analysis.deprecated_patterns],
-            model=request.model
+            model=request.model,
+            occurrences=occurrences
         )
         
         return MigrationResult(**result)
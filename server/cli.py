@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Command-line Analyzer
+Runs the repository analyzer in-process, without the server, for CI.
+
+Makes one parallel pass over the repository with the same rules as the server,
+reuses per-file results from a persistent match cache between runs and exits
+with a severity-based code (Low 0, Medium 1, High 2, Critical 3).
+
+Usage:
+    cd server
+    python -m cli <repository_path> [--format text|json|sarif] [--output FILE]
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+from analyzer import Match, RepositoryAnalyzer
+from config import MATCH_CACHE_PATH
+from match_cache import MatchCache
+from models import AnalysisResult
+
+# Exit codes by severity, as in test_client.py
+SEVERITY_EXIT_CODES = {
+    "Low": 0,
+    "Medium": 1,
+    "High": 2,
+    "Critical": 3
+}
+
+# Exit code when the analysis itself fails
+ERROR_EXIT_CODE = 4
+
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+TOOL_NAME = "Repository Outdated Score"
+TOOL_VERSION = "2.0.0"
+
+
+class ArgumentParser(argparse.ArgumentParser):
+    """Argument parser whose usage errors exit with ERROR_EXIT_CODE instead of 2 (High)."""
+
+    def error(self, message: str):
+        self.print_usage(sys.stderr)
+        self.exit(ERROR_EXIT_CODE, f"{self.prog}: error: {message}\n")
+
+
+def build_sarif(analysis: AnalysisResult, matches: Dict[str, List[Match]]) -> Dict:
+    """Build a SARIF 2.1.0 log with one result per match."""
+    rules = [
+        {
+            "id": rule.id,
+            "shortDescription": {"text": rule.description},
+            "properties": {"pattern": rule.pattern, "languages": sorted(rule.languages)}
+        }
+        for rule in RepositoryAnalyzer.RULES
+    ]
+
+    results = []
+    for path in sorted(matches):
+        for index, line, column in matches[path]:
+            results.append({
+                "ruleId": rules[index]["id"],
+                "ruleIndex": index,
+                "level": "warning",
+                "message": {"text": f"Deprecated API: {rules[index]['shortDescription']['text']}"},
+                "locations": [{
+                    "physicalLocation": {
+                        "artifactLocation": {"uri": path.replace(os.sep, "/"), "uriBaseId": "%SRCROOT%"},
+                        "region": {"startLine": line, "startColumn": column}
+                    }
+                }]
+            })
+
+    return {
+        "$schema": SARIF_SCHEMA,
+        "version": "2.1.0",
+        "runs": [{
+            "tool": {"driver": {"name": TOOL_NAME, "version": TOOL_VERSION, "rules": rules}},
+            "originalUriBaseIds": {
+                "%SRCROOT%": {"uri": Path(analysis.repository_path).resolve().as_uri() + "/"}
+            },
+            "results": results,
+            "properties": {
+                "total_files_analyzed": analysis.total_files_analyzed,
+                "total_deprecations": analysis.total_deprecations,
+                "outdated_score": analysis.outdated_score,
+                "severity": analysis.severity
+            }
+        }]
+    }
+
+
+def format_text(analysis: AnalysisResult) -> str:
+    """Human readable report in the style of test_client.py."""
+    lines = [
+        "=" * 60,
+        "Repository Outdated Score Analysis",
+        "=" * 60,
+        f"\n📁 Repository: {analysis.repository_path}"
+    ]
+    if analysis.ref:
+        lines.append(f"🌿 Ref: {analysis.ref} ({analysis.commit})")
+    lines += [
+        f"📊 Files Analyzed: {analysis.total_files_analyzed}",
+        f"🔍 Total Deprecations: {analysis.total_deprecations}",
+        f"📈 Outdated Score: {analysis.outdated_score}/100",
+        f"⚠️  Severity: {analysis.severity}"
+    ]
+
+    if analysis.deprecated_patterns:
+        lines.append("\n🔎 Deprecated Patterns Found:")
+        for pattern in analysis.deprecated_patterns:
+            lines.append(f"  • {pattern.description}: {pattern.count} occurrences")
+
+    if analysis.recommendations:
+        lines.append("\n💡 Recommendations:")
+        for i, rec in enumerate(analysis.recommendations, 1):
+            lines.append(f"  {i}. {rec}")
+
+    lines.append("\n" + "=" * 60)
+    return "\n".join(lines)
+
+
+def run(args: argparse.Namespace) -> AnalysisResult:
+    """Scan the repository and write the report; returns the analysis."""
+    match_cache = None
+    try:
+        analyzer = RepositoryAnalyzer(args.repository_path, ref=args.ref)
+        if not args.no_cache:
+            match_cache = MatchCache(args.cache)
+        scan = analyzer.scan(workers=max(1, args.workers), match_cache=match_cache)
+    finally:
+        if match_cache is not None:
+            match_cache.close()
+
+    analysis = scan.analysis
+    if match_cache is not None:
+        print(f"♻️  Match cache: {scan.cache_hits}/{analysis.total_files_analyzed} files reused", file=sys.stderr)
+
+    if args.format == "json":
+        report = analysis.model_dump_json(indent=2, exclude_none=True)
+    elif args.format == "sarif":
+        report = json.dumps(build_sarif(analysis, scan.matches), indent=2)
+    else:
+        report = format_text(analysis)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report + "\n")
+        print(f"📝 Report written to {args.output}", file=sys.stderr)
+        if args.format != "text":
+            # stdout is free, so CI logs still get the summary from the same pass
+            print(format_text(analysis))
+    else:
+        print(report)
+
+    return analysis
+
+
+def main():
+    """Main function."""
+    parser = ArgumentParser(
+        prog="python -m cli",
+        description="Analyze a repository for deprecated code without running the server.",
+        epilog="Exit codes: 0 Low, 1 Medium, 2 High, 3 Critical, 4 analysis error."
+    )
+    parser.add_argument("repository_path", help="Path to the repository to analyze")
+    parser.add_argument("--ref", help="Analyze this branch, tag or commit from the git object database")
+    parser.add_argument("--format", choices=["text", "json", "sarif"], default="text", help="Output format (default: text)")
+    parser.add_argument("--output", help="Write the report to this file; a text summary is printed instead")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Matching processes (default: CPU count)")
+    parser.add_argument("--cache", default=MATCH_CACHE_PATH, help=f"Match cache file (default: {MATCH_CACHE_PATH})")
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or write the match cache")
+    args = parser.parse_args()
+
+    try:
+        analysis = run(args)
+    except ValueError as e:
+        print(f"❌ Error: {e}", file=sys.stderr)
+        sys.exit(ERROR_EXIT_CODE)
+    except Exception as e:
+        # Any other failure (cache, git, output file) must not pass as a severity
+        print(f"❌ Analysis failed: {type(e).__name__}: {e}", file=sys.stderr)
+        sys.exit(ERROR_EXIT_CODE)
+
+    sys.exit(SEVERITY_EXIT_CODES.get(analysis.severity, 0))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,9 @@
 Configuration constants for the repository migration server.
 """
 
+import os
+from pathlib import Path
+
 # LLM Model Configuration
 DEFAULT_MODEL = "gpt-4"
 
@@ -9,6 +12,30 @@ DEFAULT_MODEL = "gpt-4"
 AGENT_MIGRATION_TIMEOUT = 300  # 5 minutes - timeout for Copilot agent operations
 CLIENT_MIGRATION_TIMEOUT = 600  # 10 minutes - HTTP timeout for client requests
 ANALYSIS_TIMEOUT = 60  # 1 minute
+ESTIMATE_DEADLINE_MS = 800  # default time budget of estimate-mode analysis
+ESTIMATE_MIN_SAMPLE_FILES = 30  # files always sampled, even past the deadline, for a usable interval
 
 # Content Formatting
 MAX_CHANGE_DESCRIPTION_LENGTH = 200  # characters
+
+# Rewrite Cache Configuration
+REWRITE_CACHE_PATH = os.environ.get(
+    "REWRITE_CACHE_PATH",
+    str(Path.home() / ".cache" / "code-migration" / "rewrites.sqlite3")
+)
+REWRITE_CACHE_MAX_ENTRIES = 10000  # least recently used rewrites are evicted beyond this
+REWRITE_CACHE_ENABLED = os.environ.get("REWRITE_CACHE_ENABLED", "1") != "0"  # 0 sends every snippet to the agent
+# 1 gives every /migrate a fresh in-memory cache, so lookups always miss (load testing)
+REWRITE_CACHE_PER_REQUEST = os.environ.get("REWRITE_CACHE_PER_REQUEST", "") == "1"
+
+# Fake Copilot Backend (offline load testing, see fake_copilot.py)
+USE_FAKE_COPILOT = os.environ.get("COPILOT_FAKE", "") == "1"
+FAKE_COPILOT_LATENCY = float(os.environ.get("COPILOT_FAKE_LATENCY", "0.05"))  # seconds per event
+FAKE_COPILOT_FAILURE_RATE = float(os.environ.get("COPILOT_FAKE_FAILURE_RATE", "0.0"))  # 0.0-1.0
+
+# Match Cache Configuration (per-file scan results reused by the CLI between runs)
+MATCH_CACHE_PATH = os.environ.get(
+    "MATCH_CACHE_PATH",
+    str(Path.home() / ".cache" / "code-migration" / "matches.sqlite3")
+)
+MATCH_CACHE_MAX_ENTRIES = 100000  # least recently used file results are evicted beyond this
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Dart Blocks
+Locates constructor calls in Dart source so a whole widget expression can be
+rewritten as one block, with its child subtrees left in place.
+"""
+
+import bisect
+import re
+from typing import List, NamedTuple, Optional, Tuple
+
+# Named arguments whose values are child subtrees: they are cut out of a block
+# and replaced by placeholders, so the block only covers the widget itself
+HOLE_ARGUMENTS = ('child', 'children')
+
+_OPENERS = {'(': ')', '[': ']', '{': '}'}
+
+# Constructor name suffix (".named", type arguments) up to the argument list
+_CALL_OPEN = re.compile(r'\s*(?:\.\w+)?\s*(?:<[^<>()]*>)?\s*\(')
+_HOLE_ARGUMENT = re.compile(r'\s*(?:%s)\s*:\s*' % '|'.join(HOLE_ARGUMENTS))
+
+
+class CallBlock(NamedTuple):
+    """Extent of a constructor call, as offsets into the source."""
+    start: int
+    end: int
+    holes: List[Tuple[int, int]]
+
+
+def hole_placeholder(number: int) -> str:
+    """Placeholder standing for the number-th child argument value of a block."""
+    return f"__CHILD_{number}__"
+
+
+def _is_string_start(text: str, i: int) -> bool:
+    if text[i] in '\'"':
+        return True
+    # Raw string prefix, unless it ends an identifier such as `bar'`
+    return (text[i] == 'r' and i + 1 < len(text) and text[i + 1] in '\'"'
+            and (i == 0 or not (text[i - 1].isalnum() or text[i - 1] in '_$')))
+
+
+def _skip_string(text: str, i: int) -> int:
+    """Return the offset just past the string literal starting at i."""
+    raw = text[i] == 'r'
+    if raw:
+        i += 1
+    quote = text[i]
+    delimiter = quote * 3 if text.startswith(quote * 3, i) else quote
+    i += len(delimiter)
+    while i < len(text):
+        if text.startswith(delimiter, i):
+            return i + len(delimiter)
+        c = text[i]
+        if c == '\\' and not raw:
+            i += 2
+        elif c == '$' and not raw and text.startswith('{', i + 1):
+            i = _skip_code(text, i + 2, '}')
+        elif c == '\n' and len(delimiter) == 1:
+            # Unterminated single-line string
+            return i
+        else:
+            i += 1
+    return len(text)
+
+
+def _skip_comment(text: str, i: int) -> int:
+    """Return the offset just past the comment starting at i (block comments nest in Dart)."""
+    if text.startswith('//', i):
+        end = text.find('\n', i)
+        return len(text) if end < 0 else end
+    depth = 0
+    while i < len(text):
+        if text.startswith('/*', i):
+            depth += 1
+            i += 2
+        elif text.startswith('*/', i):
+            depth -= 1
+            i += 2
+            if depth == 0:
+                return i
+        else:
+            i += 1
+    return len(text)
+
+
+def _skip_code(text: str, i: int, closer: str, commas: Optional[List[int]] = None) -> int:
+    """
+    Return the offset just past the `closer` that balances an opening bracket.
+
+    Nested brackets, strings and comments are skipped; the offsets of top-level
+    commas are appended to `commas` when given. Unbalanced input runs to the end.
+    """
+    while i < len(text):
+        c = text[i]
+        if c == closer:
+            return i + 1
+        if c in _OPENERS:
+            i = _skip_code(text, i + 1, _OPENERS[c])
+        elif _is_string_start(text, i):
+            i = _skip_string(text, i)
+        elif text.startswith('//', i) or text.startswith('/*', i):
+            i = _skip_comment(text, i)
+        else:
+            if c == ',' and commas is not None:
+                commas.append(i)
+            i += 1
+    return len(text)
+
+
+def non_code_spans(text: str) -> List[Tuple[int, int]]:
+    """Sorted (start, end) offsets of every comment and string literal."""
+    spans = []
+    i = 0
+    while i < len(text):
+        if text.startswith('//', i) or text.startswith('/*', i):
+            end = _skip_comment(text, i)
+        elif _is_string_start(text, i):
+            end = _skip_string(text, i)
+        else:
+            i += 1
+            continue
+        spans.append((i, end))
+        i = end
+    return spans
+
+
+def in_code(spans: List[Tuple[int, int]], offset: int) -> bool:
+    """Check whether an offset lies outside the comments and strings of non_code_spans."""
+    index = bisect.bisect_right(spans, (offset, float('inf'))) - 1
+    return index < 0 or offset >= spans[index][1]
+
+
+def find_call(text: str, start: int, name_end: int) -> Optional[CallBlock]:
+    """
+    Find the constructor call whose name spans text[start:name_end].
+
+    Returns:
+        CallBlock from the name to the closing parenthesis, with the value
+        spans of its HOLE_ARGUMENTS, or None if no complete call follows
+    """
+    match = _CALL_OPEN.match(text, name_end)
+    if not match:
+        return None
+
+    commas: List[int] = []
+    end = _skip_code(text, match.end(), ')', commas)
+    if end > len(text) or text[end - 1] != ')':
+        return None
+
+    holes = []
+    boundaries = [match.end() - 1] + commas + [end - 1]
+    for argument_start, argument_end in zip(boundaries, boundaries[1:]):
+        hole = _HOLE_ARGUMENT.match(text, argument_start + 1, argument_end)
+        if hole:
+            value_end = argument_start + 1 + len(text[argument_start + 1:argument_end].rstrip())
+            if value_end > hole.end():
+                holes.append((hole.end(), value_end))
+    return CallBlock(start, end, holes)
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Fake Copilot Client
+Drop-in offline stand-in for copilot.CopilotClient, used for load testing.
+
+Enable it in the server with COPILOT_FAKE=1 (see config.py).
+"""
+
+import asyncio
+import json
+import random
+import re
+from enum import Enum
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional
+
+from config import FAKE_COPILOT_LATENCY, FAKE_COPILOT_FAILURE_RATE
+
+
+class FakeEventType(Enum):
+    """Subset of Copilot session event types consumed by MigrationAgent."""
+    ASSISTANT_REASONING = "assistant.reasoning"
+    TOOL_EXECUTION_START = "tool.execution_start"
+    ASSISTANT_MESSAGE = "assistant.message"
+    SESSION_IDLE = "session.idle"
+
+
+# Naive textual rewrites so cache-miss replies look plausible
+FAKE_REWRITES = [
+    (r'\bheadline1\b', 'displayLarge'),
+    (r'\bheadline2\b', 'displayMedium'),
+    (r'\bheadline3\b', 'displaySmall'),
+    (r'\bheadline4\b', 'headlineLarge'),
+    (r'\bheadline5\b', 'headlineMedium'),
+    (r'\bheadline6\b', 'headlineSmall'),
+    (r'\bbodyText1\b', 'bodyLarge'),
+    (r'\bbodyText2\b', 'bodyMedium'),
+    (r'\bsubtitle1\b', 'titleLarge'),
+    (r'\bsubtitle2\b', 'titleMedium'),
+    (r'\.caption\b', '.bodySmall'),
+    (r'\bprimary:(\s*Colors\.)', r'backgroundColor:\1'),
+    (r'\bonPrimary:(\s*Colors\.)', r'foregroundColor:\1'),
+    (r'\bWillPopScope\b', 'PopScope'),
+    (r'\bButtonBar\b', 'OverflowBar'),
+]
+
+
+class FakeSession:
+    """Fake Copilot session that replays a scripted event sequence."""
+
+    def __init__(self, latency: float, failure_rate: float):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self._handlers: List[Callable] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def on(self, handler: Callable):
+        """Register an event handler."""
+        self._handlers.append(handler)
+
+    async def send(self, options: Dict):
+        """Start replying to a prompt; events are emitted in the background."""
+        if random.random() < self.failure_rate:
+            raise RuntimeError("Fake Copilot backend failure")
+        self._task = asyncio.create_task(self._reply(options.get("prompt", "")))
+
+    async def destroy(self):
+        """Cancel any in-flight reply."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+
+    async def _reply(self, prompt: str):
+        await self._emit(FakeEventType.ASSISTANT_REASONING, content="Analyzing deprecated patterns...")
+        await self._emit(FakeEventType.TOOL_EXECUTION_START, tool_name="edit_file")
+        await self._emit(FakeEventType.ASSISTANT_MESSAGE, content=self._build_reply(prompt))
+        await self._emit(FakeEventType.SESSION_IDLE)
+
+    async def _emit(self, event_type: FakeEventType, **data):
+        # Jitter each event by +/-50% of the configured latency
+        await asyncio.sleep(self.latency * random.uniform(0.5, 1.5))
+        event = SimpleNamespace(type=event_type, data=SimpleNamespace(**data))
+        for handler in self._handlers:
+            handler(event)
+
+    def _build_reply(self, prompt: str) -> str:
+        """Answer snippet rewrite prompts with JSON, anything else with a summary."""
+        snippets = re.findall(r'^\[([0-9a-f]{64})\] \([^\n]*\)\n```\n(.*?)\n```$', prompt, re.MULTILINE | re.DOTALL)
+        if not snippets:
+            return "Updated all deprecated APIs in the repository (fake backend)"
+
+        rewrites = []
+        for snippet_id, snippet in snippets:
+            rewrite = snippet
+            for pattern, replacement in FAKE_REWRITES:
+                rewrite = re.sub(pattern, replacement, rewrite)
+            rewrites.append({"id": snippet_id, "rewrite": rewrite})
+        return json.dumps(rewrites)
+
+
+class FakeCopilotClient:
+    """Offline replacement for copilot.CopilotClient with the same async surface."""
+
+    def __init__(
+        self,
+        latency: float = FAKE_COPILOT_LATENCY,
+        failure_rate: float = FAKE_COPILOT_FAILURE_RATE
+    ):
+        """
+        Args:
+            latency: Mean delay in seconds before each emitted event
+            failure_rate: Probability (0.0-1.0) that sending a prompt raises
+        """
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.is_running = False
+
+    async def start(self):
+        self.is_running = True
+
+    async def stop(self):
+        self.is_running = False
+
+    async def create_session(self, options: Dict) -> FakeSession:
+        if not self.is_running:
+            raise RuntimeError("Fake Copilot client is not started")
+        return FakeSession(self.latency, self.failure_rate)
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Git Object Access
+Reads trees and blobs straight from a repository's object database, without a checkout.
+"""
+
+import subprocess
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+
+def run_git(repo_path: str, *args: str) -> bytes:
+    """Run a git command in a repository and return its stdout."""
+    try:
+        completed = subprocess.run(
+            ["git", "-C", str(repo_path), *args],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            check=True
+        )
+    except FileNotFoundError:
+        raise ValueError("git executable not found")
+    except subprocess.CalledProcessError as e:
+        message = e.stderr.decode("utf-8", errors="replace").strip()
+        raise ValueError(f"git {args[0]} failed: {message}")
+    return completed.stdout
+
+
+def resolve_commit(repo_path: str, ref: str) -> str:
+    """Resolve a branch, tag or commit-ish to a full commit SHA."""
+    return run_git(repo_path, "rev-parse", "--verify", "--end-of-options", f"{ref}^{{commit}}").decode().strip()
+
+
+def _parse_ls_tree(output: bytes) -> List[Tuple[str, str, Optional[int]]]:
+    """Parse `git ls-tree -z [-l]` output into (blob SHA, path, size) tuples."""
+    blobs = []
+    for entry in output.split(b"\0"):
+        if not entry:
+            continue
+        meta, path = entry.split(b"\t", 1)
+        fields = meta.split()
+        if fields[1] == b"blob":
+            size = int(fields[3]) if len(fields) > 3 else None
+            blobs.append((fields[2].decode(), path.decode("utf-8", errors="surrogateescape"), size))
+    return blobs
+
+
+def list_tree(repo_path: str, treeish: str) -> List[Tuple[str, str]]:
+    """
+    List every blob reachable from a tree-ish.
+
+    Returns:
+        List of (blob SHA, repository-relative path) tuples
+    """
+    output = run_git(repo_path, "ls-tree", "-r", "-z", "--end-of-options", treeish)
+    return [(sha, path) for sha, path, _ in _parse_ls_tree(output)]
+
+
+def list_tree_with_sizes(repo_path: str, treeish: str) -> List[Tuple[str, str, int]]:
+    """
+    List every blob reachable from a tree-ish, with its size.
+
+    Returns:
+        List of (blob SHA, repository-relative path, size in bytes) tuples
+    """
+    output = run_git(repo_path, "ls-tree", "-r", "-l", "-z", "--end-of-options", treeish)
+    return _parse_ls_tree(output)
+
+
+class GitCatFile:
+    """Long-lived `git cat-file --batch` process for streaming object contents."""
+
+    def __init__(self, repo_path: str):
+        """Start the batch process for a repository."""
+        if not Path(repo_path).is_dir():
+            raise ValueError(f"Repository path does not exist: {repo_path}")
+        self._process: Optional[subprocess.Popen] = subprocess.Popen(
+            ["git", "-C", str(repo_path), "cat-file", "--batch"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
+        )
+
+    def read(self, sha: str) -> bytes:
+        """Read the raw content of an object by SHA."""
+        self._process.stdin.write(sha.encode() + b"\n")
+        self._process.stdin.flush()
+
+        header = self._process.stdout.readline()
+        if not header:
+            raise ValueError("git cat-file exited unexpectedly")
+        fields = header.split()
+        if len(fields) != 3:
+            raise ValueError(f"Object not found: {sha}")
+
+        size = int(fields[2])
+        content = self._process.stdout.read(size)
+        self._process.stdout.read(1)  # trailing newline
+        return content
+
+    def close(self):
+        """Terminate the batch process."""
+        if self._process is not None:
+            self._process.stdin.close()
+            self._process.wait()
+            self._process = None
+
+    def __enter__(self) -> "GitCatFile":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
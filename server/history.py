@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+History Analyzer
+Backfills the outdated score across a repository's git history without checkouts.
+"""
+
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from analyzer import RepositoryAnalyzer
+from git_objects import GitCatFile, list_tree, resolve_commit, run_git
+from models import HistoryPoint, HistoryResult
+
+
+class HistoryAnalyzer:
+    """Scores every commit of a ref straight from the git object database."""
+
+    def __init__(self, repo_path: str):
+        """Initialize with a local git repository."""
+        self.analyzer = RepositoryAnalyzer(repo_path)
+        self.repo_path = str(self.analyzer.repo_path)
+        # Per-pattern counts memoized per (blob SHA, extension), so each file version is matched once
+        self._blob_counts: Dict[Tuple[str, str], Tuple[int, ...]] = {}
+
+    def _list_commits(self, ref: str, max_commits: int) -> List[Tuple[str, str, str]]:
+        """List (commit SHA, root tree SHA, committer date) tuples, oldest first."""
+        output = run_git(
+            self.repo_path, "log", "--first-parent", f"--max-count={max_commits}",
+            "--format=%H %T %cI", resolve_commit(self.repo_path, ref)
+        ).decode()
+
+        commits = [tuple(line.split(" ", 2)) for line in output.splitlines() if line]
+        commits.reverse()
+        return commits
+
+    def _score_tree(self, tree: str, cat_file: GitCatFile) -> Tuple[int, List[int]]:
+        """Return (code file count, per-pattern totals) for a root tree."""
+        blobs = [
+            (sha, path) for sha, path in list_tree(self.repo_path, tree)
+            if self.analyzer.is_code_path(path)
+        ]
+
+        pattern_counts = [0] * len(self.analyzer.RULES)
+        for sha, path in blobs:
+            # The same blob can be routed to different rules under another extension
+            key = (sha, Path(path).suffix)
+            counts = self._blob_counts.get(key)
+            if counts is None:
+                content = cat_file.read(sha).decode("utf-8", errors="ignore")
+                counts = tuple(self.analyzer.count_patterns(path, content))
+                self._blob_counts[key] = counts
+            for index, count in enumerate(counts):
+                pattern_counts[index] += count
+
+        return len(blobs), pattern_counts
+
+    def analyze(self, ref: str = "HEAD", max_commits: int = 1000) -> HistoryResult:
+        """Score the most recent first-parent commits of a ref."""
+        commits = self._list_commits(ref, max_commits)
+
+        history = []
+        # Commits that share a root tree (e.g. merges, reverts) share a score
+        tree_scores: Dict[str, Tuple[int, List[int]]] = {}
+        with GitCatFile(self.repo_path) as cat_file:
+            for commit, tree, date in commits:
+                if tree not in tree_scores:
+                    tree_scores[tree] = self._score_tree(tree, cat_file)
+                total_files, pattern_counts = tree_scores[tree]
+
+                total_deprecations = sum(pattern_counts)
+                outdated_score = (
+                    self.analyzer.calculate_score(total_deprecations, total_files)
+                    if total_files else 0.0
+                )
+
+                history.append(HistoryPoint(
+                    commit=commit,
+                    date=date,
+                    outdated_score=round(outdated_score, 2),
+                    total_deprecations=total_deprecations,
+                    total_files_analyzed=total_files,
+                    pattern_counts={
+                        rule.pattern: count
+                        for rule, count in zip(self.analyzer.RULES, pattern_counts)
+                        if count > 0
+                    }
+                ))
+
+        return HistoryResult(
+            repository_path=self.repo_path,
+            ref=ref,
+            commits_analyzed=len(history),
+            unique_blobs_scanned=len(self._blob_counts),
+            history=history
+        )
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Load test harness for the Repository Outdated Score Server
+Drives mixed /analyze and /migrate traffic at a target rate and reports
+throughput, latency percentiles, error rates and server memory over time.
+
+By default the server is spawned locally with the fake Copilot backend
+(see fake_copilot.py), so the whole run works offline.
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import requests
+
+from config import DEFAULT_MODEL, CLIENT_MIGRATION_TIMEOUT
+
+SERVER_DIR = Path(__file__).resolve().parent
+DEFAULT_REPO = SERVER_DIR.parent / "app"
+
+
+def start_server(
+    port: int,
+    latency: float,
+    failure_rate: float,
+    cache_path: str,
+    rewrite_cache: bool = False
+) -> subprocess.Popen:
+    """
+    Spawn the server with the fake Copilot backend and wait until it is healthy.
+
+    Unless `rewrite_cache` is set, every /migrate gets a fresh in-memory rewrite
+    cache: requests still take the cached migration path of a default server,
+    but every lookup misses, so the fake latency and failure rate always apply.
+    """
+    env = dict(os.environ)
+    env.update({
+        "COPILOT_FAKE": "1",
+        "COPILOT_FAKE_LATENCY": str(latency),
+        "COPILOT_FAKE_FAILURE_RATE": str(failure_rate),
+        "REWRITE_CACHE_PATH": cache_path,
+        "REWRITE_CACHE_PER_REQUEST": "0" if rewrite_cache else "1",
+    })
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app",
+         "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=SERVER_DIR,
+        env=env
+    )
+
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}")
+        try:
+            if requests.get(f"http://127.0.0.1:{port}/health", timeout=1).ok:
+                return process
+        except requests.exceptions.RequestException:
+            pass
+        time.sleep(0.2)
+
+    process.terminate()
+    raise RuntimeError("Server did not become healthy within 30 seconds")
+
+
+def read_rss_mb(pid: int) -> Optional[float]:
+    """Read the resident set size of a process in MiB (Linux only)."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+class MemorySampler(threading.Thread):
+    """Background thread sampling server memory at a fixed interval."""
+
+    def __init__(self, pid: int, interval: float = 1.0):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.samples: List[Dict] = []
+        self._stop_event = threading.Event()
+        self._start_time = time.monotonic()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            rss = read_rss_mb(self.pid)
+            if rss is not None:
+                self.samples.append({
+                    "elapsed_s": round(time.monotonic() - self._start_time, 2),
+                    "rss_mb": round(rss, 1)
+                })
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def prepare_workdir(repo_path: Path) -> str:
+    """Copy the repository into a private working directory for one /migrate request."""
+    workdir = tempfile.mkdtemp(prefix="load-test-")
+    shutil.copytree(repo_path, Path(workdir) / repo_path.name)
+    return workdir
+
+
+def send_request(
+    server_url: str,
+    endpoint: str,
+    repo_path: Path,
+    model: str,
+    scheduled_at: float,
+    workdir: Optional[str] = None
+) -> Dict:
+    """
+    Send one request and time it from its scheduled start.
+
+    Latency includes any time spent queued behind busy workers, so a saturated
+    server shows up as rising latency instead of a silently lower request rate.
+    /migrate requests run against `workdir`, prepared beforehand with
+    prepare_workdir so the copy is not timed.
+    """
+    try:
+        if endpoint == "/migrate":
+            payload = {"path": str(Path(workdir) / repo_path.name), "model": model}
+        else:
+            payload = {"path": str(repo_path)}
+
+        response = requests.post(f"{server_url}{endpoint}", json=payload, timeout=CLIENT_MIGRATION_TIMEOUT)
+        latency = time.monotonic() - scheduled_at
+
+        error = None
+        if response.status_code >= 400:
+            error = f"HTTP {response.status_code}"
+        elif endpoint == "/migrate":
+            try:
+                if not response.json().get("success"):
+                    error = "migration failed"
+            except ValueError:
+                error = "invalid JSON response"
+        return {"endpoint": endpoint, "latency": latency, "error": error}
+
+    except requests.exceptions.RequestException as e:
+        return {"endpoint": endpoint, "latency": time.monotonic() - scheduled_at, "error": type(e).__name__}
+    finally:
+        if workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(results: List[Dict], elapsed: float) -> Dict:
+    """Aggregate raw request results into per-endpoint statistics."""
+    summary = {}
+    for endpoint in ["all", "/analyze", "/migrate"]:
+        selected = [r for r in results if endpoint == "all" or r["endpoint"] == endpoint]
+        if not selected:
+            continue
+        latencies_ms = [r["latency"] * 1000 for r in selected]
+        errors = [r for r in selected if r["error"]]
+        error_kinds: Dict[str, int] = {}
+        for r in errors:
+            error_kinds[r["error"]] = error_kinds.get(r["error"], 0) + 1
+        summary[endpoint] = {
+            "requests": len(selected),
+            "throughput_rps": round(len(selected) / elapsed, 2) if elapsed else 0.0,
+            "p50_ms": round(percentile(latencies_ms, 50), 1),
+            "p95_ms": round(percentile(latencies_ms, 95), 1),
+            "p99_ms": round(percentile(latencies_ms, 99), 1),
+            "error_rate": round(len(errors) / len(selected), 4),
+            "errors": error_kinds
+        }
+    return summary
+
+
+def run_load(
+    server_url: str,
+    repo_path: Path,
+    rps: float,
+    duration: float,
+    migrate_ratio: float,
+    workers: int,
+    model: str,
+    server_pid: Optional[int] = None
+) -> Dict:
+    """Drive mixed traffic at the target rate and collect a report."""
+    total_requests = int(rps * duration)
+    endpoints = ["/migrate" if random.random() < migrate_ratio else "/analyze" for _ in range(total_requests)]
+
+    # Migrations rewrite files, so each gets a private copy, made before the clock starts
+    workdirs = [prepare_workdir(repo_path) if endpoint == "/migrate" else None for endpoint in endpoints]
+
+    sampler = MemorySampler(server_pid) if server_pid else None
+    if sampler:
+        sampler.start()
+
+    futures = []
+    start = time.monotonic()
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for i, (endpoint, workdir) in enumerate(zip(endpoints, workdirs)):
+                scheduled_at = start + i / rps
+                delay = scheduled_at - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                futures.append(executor.submit(
+                    send_request, server_url, endpoint, repo_path, model, scheduled_at, workdir
+                ))
+            results = [f.result() for f in futures]
+    finally:
+        # Copies of requests that never ran (e.g. on Ctrl+C)
+        for workdir in workdirs:
+            if workdir:
+                shutil.rmtree(workdir, ignore_errors=True)
+    elapsed = time.monotonic() - start
+
+    if sampler:
+        sampler.stop()
+
+    return {
+        "target_rps": rps,
+        "duration_s": round(elapsed, 2),
+        "migrate_ratio": migrate_ratio,
+        "endpoints": summarize(results, elapsed),
+        "memory": sampler.samples if sampler else []
+    }
+
+
+def print_report(report: Dict):
+    """Print a human readable load test report."""
+    print("=" * 60)
+    print("Load Test Results")
+    print("=" * 60)
+    print(f"\n🎯 Target rate: {report['target_rps']} req/s for {report['duration_s']}s "
+          f"({report['migrate_ratio']:.0%} /migrate)")
+
+    for endpoint, stats in report["endpoints"].items():
+        print(f"\n📊 {endpoint}: {stats['requests']} requests, {stats['throughput_rps']} req/s")
+        print(f"   ⏱️  p50 {stats['p50_ms']} ms | p95 {stats['p95_ms']} ms | p99 {stats['p99_ms']} ms")
+        print(f"   ❌ Error rate: {stats['error_rate']:.2%}")
+        for kind, count in stats["errors"].items():
+            print(f"      • {kind}: {count}")
+
+    memory = report["memory"]
+    if memory:
+        rss = [sample["rss_mb"] for sample in memory]
+        print(f"\n💾 Server memory: start {rss[0]} MiB, peak {max(rss)} MiB, end {rss[-1]} MiB")
+        step = max(1, len(memory) // 10)
+        for sample in memory[::step]:
+            print(f"   t={sample['elapsed_s']:>6}s  {sample['rss_mb']} MiB")
+
+    print("\n" + "=" * 60)
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Load test the Repository Outdated Score Server")
+    parser.add_argument("--url", help="Target an already running server instead of spawning one")
+    parser.add_argument("--server-pid", type=int, help="PID of the --url server, for memory sampling")
+    parser.add_argument("--port", type=int, default=8765, help="Port for the spawned server (default: 8765)")
+    parser.add_argument("--repo", default=str(DEFAULT_REPO), help="Repository to analyze/migrate (default: ../app)")
+    parser.add_argument("--rps", type=float, default=5.0, help="Target requests per second (default: 5)")
+    parser.add_argument("--duration", type=float, default=30.0, help="Test duration in seconds (default: 30)")
+    parser.add_argument("--migrate-ratio", type=float, default=0.2, help="Fraction of /migrate requests (default: 0.2)")
+    parser.add_argument("--workers", type=int, default=32, help="Concurrent client threads (default: 32)")
+    parser.add_argument("--model", default=DEFAULT_MODEL, help=f"Model sent with /migrate (default: {DEFAULT_MODEL})")
+    parser.add_argument("--fake-latency", type=float, default=0.05, help="Fake Copilot seconds per event (default: 0.05)")
+    parser.add_argument("--fake-failure-rate", type=float, default=0.0, help="Fake Copilot failure probability (default: 0)")
+    parser.add_argument("--rewrite-cache", action="store_true",
+                        help="Share one rewrite cache across requests (default: a fresh one per /migrate, so every lookup misses)")
+    parser.add_argument("--json", help="Also write the full report as JSON to this file")
+    args = parser.parse_args()
+
+    repo_path = Path(args.repo).resolve()
+    if not repo_path.is_dir():
+        print(f"❌ Error: Path does not exist: {repo_path}")
+        sys.exit(1)
+
+    process = None
+    cache_dir = tempfile.mkdtemp(prefix="load-test-cache-")
+    try:
+        if args.url:
+            server_url = args.url.rstrip("/")
+            server_pid = args.server_pid
+        else:
+            print(f"🚀 Starting server with fake Copilot backend on port {args.port}")
+            process = start_server(
+                args.port,
+                args.fake_latency,
+                args.fake_failure_rate,
+                str(Path(cache_dir) / "rewrites.sqlite3"),
+                args.rewrite_cache
+            )
+            server_url = f"http://127.0.0.1:{args.port}"
+            server_pid = process.pid
+
+        print(f"📈 Sending {args.rps} req/s for {args.duration}s to {server_url}\n")
+        report = run_load(
+            server_url,
+            repo_path,
+            args.rps,
+            args.duration,
+            args.migrate_ratio,
+            args.workers,
+            args.model,
+            server_pid
+        )
+        print_report(report)
+
+        if args.json:
+            with open(args.json, "w") as f:
+                json.dump(report, f, indent=2)
+            print(f"📝 Report written to {args.json}")
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=10)
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
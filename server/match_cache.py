@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Match Cache
+Persistent store of per-file scan results keyed on file content and rule set.
+"""
+
+import hashlib
+from pathlib import PurePath
+
+from config import MATCH_CACHE_PATH, MATCH_CACHE_MAX_ENTRIES
+from sqlite_cache import SqliteLRUCache
+
+
+class MatchCache(SqliteLRUCache):
+    """SQLite-backed LRU cache of a file's matches, as JSON (RULES index, line, column) lists."""
+
+    TABLE = "file_matches"
+
+    def __init__(
+        self,
+        path: str = MATCH_CACHE_PATH,
+        max_entries: int = MATCH_CACHE_MAX_ENTRIES
+    ):
+        """Open (or create) the cache database at the given path."""
+        super().__init__(path, max_entries)
+
+    @staticmethod
+    def make_key(rules_fingerprint: str, relative_path: str, content: str) -> str:
+        """
+        Build the key of a file's matches.
+
+        The extension is part of the key because it decides which rules apply;
+        the rest of the path is not, so moved or duplicated files still hit.
+        """
+        material = "\0".join([rules_fingerprint, PurePath(relative_path).suffix, content])
+        return hashlib.sha256(material.encode("utf-8", errors="surrogateescape")).hexdigest()
@@ -5,32 +5,57 @@ Handles automated code migration using Copilot's agentic workflows.
 """
 
 import asyncio
+import json
 import logging
-from typing import Optional, List, Dict
+import re
+from typing import Optional, List, Dict, Tuple
 from pathlib import Path
 
-try:
-    from copilot import CopilotClient
-    COPILOT_AVAILABLE = True
-except ImportError:
-    COPILOT_AVAILABLE = False
-
 from config import (
     DEFAULT_MODEL,
     AGENT_MIGRATION_TIMEOUT,
-    MAX_CHANGE_DESCRIPTION_LENGTH
+    MAX_CHANGE_DESCRIPTION_LENGTH,
+    REWRITE_CACHE_ENABLED,
+    REWRITE_CACHE_PER_REQUEST,
+    USE_FAKE_COPILOT
 )
 
+if USE_FAKE_COPILOT:
+    from fake_copilot import FakeCopilotClient as CopilotClient
+    COPILOT_AVAILABLE = True
+else:
+    try:
+        from copilot import CopilotClient
+        COPILOT_AVAILABLE = True
+    except ImportError:
+        COPILOT_AVAILABLE = False
+from analyzer import BLOCK_SCOPE, FILE_SCOPE
+from dart_blocks import hole_placeholder
+from rewrite_cache import RewriteCache
+
 logger = logging.getLogger(__name__)
 
 
+# Modern equivalents for the Flutter/Dart deprecations, shared by all prompts
+FLUTTER_MIGRATION_MAPPINGS = """- headline1-6 → displayLarge, displayMedium, displaySmall, headlineLarge, headlineMedium, headlineSmall
+- bodyText1-2 → bodyLarge, bodyMedium
+- subtitle1-2 → titleLarge, titleMedium
+- caption → bodySmall
+- ButtonStyle.primary → backgroundColor
+- ButtonStyle.onPrimary → foregroundColor
+- WillPopScope → PopScope
+- ButtonBar → OverflowBar
+- AppBar.brightness → systemOverlayStyle"""
+
+
 class MigrationAgent:
     """Agent that handles code migration using GitHub Copilot SDK."""
     
-    def __init__(self):
+    def __init__(self, rewrite_cache: Optional[RewriteCache] = None):
         """Initialize the migration agent."""
         self.client: Optional[CopilotClient] = None
         self.is_initialized = False
+        self.rewrite_cache = rewrite_cache
         
     async def initialize(self) -> bool:
         """
@@ -43,6 +68,12 @@ class MigrationAgent:
             logger.warning("GitHub Copilot SDK is not installed")
             return False
         
+        if self.rewrite_cache is None and REWRITE_CACHE_ENABLED and not REWRITE_CACHE_PER_REQUEST:
+            try:
+                self.rewrite_cache = RewriteCache()
+            except Exception as e:
+                logger.warning(f"Rewrite cache unavailable: {e}")
+
         try:
             self.client = CopilotClient()
             await self.client.start()
@@ -63,13 +94,17 @@ class MigrationAgent:
                 logger.info("Migration agent shut down")
             except Exception as e:
                 logger.error(f"Error during shutdown: {e}")
+        if self.rewrite_cache is not None:
+            self.rewrite_cache.close()
+            self.rewrite_cache = None
     
     async def migrate_repository(
         self, 
         repo_path: str, 
         deprecations: List[Dict],
         model: str = DEFAULT_MODEL,
-        timeout: int = AGENT_MIGRATION_TIMEOUT
+        timeout: int = AGENT_MIGRATION_TIMEOUT,
+        occurrences: Optional[List[Dict]] = None
     ) -> Dict:
         """
         Migrate a repository by fixing deprecated code patterns.
@@ -79,6 +114,10 @@ class MigrationAgent:
             deprecations: List of deprecation patterns found
             model: LLM model to use (default from config.DEFAULT_MODEL)
             timeout: Timeout in seconds (default from config.AGENT_MIGRATION_TIMEOUT)
+            occurrences: Optional list of deprecated source lines (see
+                RepositoryAnalyzer.find_occurrences). When given, cached
+                rewrites are applied locally and only cache misses are sent
+                to the Copilot session.
             
         Returns:
             Dict with migration results including changes made and status
@@ -91,72 +130,31 @@ class MigrationAgent:
                 "message": "Please install Copilot CLI: https://docs.github.com/en/copilot/copilot-cli"
             }
         
+        if occurrences is not None and REWRITE_CACHE_PER_REQUEST:
+            rewrite_cache = RewriteCache(":memory:")
+            try:
+                return await self._migrate_occurrences(repo_path, occurrences, model, timeout, rewrite_cache)
+            finally:
+                rewrite_cache.close()
+        
+        if occurrences is not None and self.rewrite_cache is not None:
+            return await self._migrate_occurrences(repo_path, occurrences, model, timeout, self.rewrite_cache)
+        
         try:
-            # Create a session for migration
-            session = await self.client.create_session({"model": model})
-            
             # Build migration prompt based on deprecations
             prompt = self._build_migration_prompt(repo_path, deprecations)
             
-            # Track events and collect response
             migration_log = []
-            response_content = None
-            done = asyncio.Event()
-            
-            def on_event(event):
-                nonlocal response_content
-                
-                try:
-                    event_type = event.type.value if hasattr(event.type, 'value') else str(event.type)
-                except AttributeError:
-                    event_type = "unknown"
-                    logger.warning(f"Event has unexpected structure: {event}")
-                
-                if event_type == "assistant.reasoning":
-                    migration_log.append({
-                        "type": "reasoning",
-                        "content": event.data.content
-                    })
-                    logger.info(f"Agent reasoning: {event.data.content}")
-                    
-                elif event_type == "tool.execution_start":
-                    migration_log.append({
-                        "type": "tool",
-                        "tool_name": event.data.tool_name
-                    })
-                    logger.info(f"Executing tool: {event.data.tool_name}")
-                    
-                elif event_type == "assistant.message":
-                    response_content = event.data.content
-                    migration_log.append({
-                        "type": "message",
-                        "content": event.data.content
-                    })
-                    
-                elif event_type == "session.idle":
-                    done.set()
-            
-            session.on(on_event)
-            
-            # Send migration request
-            await session.send({"prompt": prompt})
-            
-            # Wait for completion (with timeout)
-            try:
-                await asyncio.wait_for(done.wait(), timeout=timeout)
-            except asyncio.TimeoutError:
-                logger.error(f"Migration timed out after {timeout} seconds")
-                await session.destroy()
+            response_content, error = await self._run_session(prompt, model, timeout, migration_log)
+            if error:
                 return {
                     "success": False,
-                    "error": f"Migration timed out after {timeout} seconds",
+                    "message": "Migration failed",
+                    "error": error,
                     "changes": [],
                     "migration_log": migration_log
                 }
             
-            # Clean up session
-            await session.destroy()
-            
             return {
                 "success": True,
                 "message": response_content or "Migration completed",
@@ -169,18 +167,226 @@ class MigrationAgent:
             logger.error(f"Migration failed: {e}")
             return {
                 "success": False,
+                "message": "Migration failed",
                 "error": str(e),
                 "changes": [],
                 "migration_log": []
             }
     
-    def _build_migration_prompt(self, repo_path: str, deprecations: List[Dict]) -> str:
-        """Build a prompt for the migration agent."""
+    async def _migrate_occurrences(
+        self,
+        repo_path: str,
+        occurrences: List[Dict],
+        model: str,
+        timeout: int,
+        rewrite_cache: RewriteCache
+    ) -> Dict:
+        """
+        Apply cached rewrites locally and ask the agent only for cache misses.
+        
+        Line and block occurrences are rewritten through the cache. FILE_SCOPE
+        occurrences need edits elsewhere in the file (e.g. imports), so their
+        files are handed to the file-editing agent afterwards.
+        """
+        migration_log = []
+        cache_hits = 0
+        misses: Dict[str, Dict] = {}
+        changes: List[str] = []
+        
+        line_occurrences = []
+        agent_occurrences = []
+        for occurrence in occurrences:
+            if occurrence["scope"] == FILE_SCOPE:
+                agent_occurrences.append(occurrence)
+            else:
+                line_occurrences.append(occurrence)
+        
+        try:
+            # Group occurrences by cache key so identical snippets are rewritten once
+            keyed: Dict[str, List[Dict]] = {}
+            for occurrence in line_occurrences:
+                rule = "|".join(occurrence["patterns"])
+                key = RewriteCache.make_key(occurrence["snippet"], rule, model)
+                keyed.setdefault(key, []).append(occurrence)
+            
+            rewrites: Dict[str, str] = {}
+            for key, group in keyed.items():
+                cached = rewrite_cache.get(key)
+                if cached is not None and self._is_valid_rewrite(group[0], cached):
+                    rewrites[key] = cached
+                else:
+                    misses[key] = group[0]
+            
+            cache_hits = len(keyed) - len(misses)
+            migration_log.append({
+                "type": "cache",
+                "content": f"{cache_hits} cached rewrites, {len(misses)} sent to agent"
+            })
+            logger.info(f"Rewrite cache: {cache_hits} hits, {len(misses)} misses")
+            
+            if misses:
+                prompt = self._build_rewrite_prompt(misses)
+                response_content, error = await self._run_session(prompt, model, timeout, migration_log)
+                if error:
+                    return {
+                        "success": False,
+                        "message": "Migration failed",
+                        "error": error,
+                        "changes": [],
+                        "migration_log": migration_log,
+                        "cache_hits": cache_hits,
+                        "cache_misses": len(misses)
+                    }
+                
+                for key, rewrite in self._parse_rewrites(response_content).items():
+                    if key in misses and self._is_valid_rewrite(misses[key], rewrite):
+                        rewrites[key] = rewrite
+                        rewrite_cache.put(key, rewrite)
+            
+            changes = self._apply_rewrites(repo_path, keyed, rewrites)
+            unresolved = len(keyed) - len(rewrites)
+            message = f"Rewrote {len(changes)} deprecated snippets ({cache_hits} cached rewrites reused)"
+            if unresolved:
+                message += f"; {unresolved} snippets were not rewritten by the agent"
+            
+            if agent_occurrences:
+                agent_log = []
+                prompt = self._build_migration_prompt(
+                    repo_path,
+                    self._summarize_occurrences(agent_occurrences),
+                    files=sorted({occurrence["file"] for occurrence in agent_occurrences})
+                )
+                response_content, error = await self._run_session(prompt, model, timeout, agent_log)
+                migration_log.extend(agent_log)
+                if error:
+                    return {
+                        "success": False,
+                        "message": f"{message}; file-level migration failed",
+                        "error": error,
+                        "changes": changes,
+                        "migration_log": migration_log,
+                        "cache_hits": cache_hits,
+                        "cache_misses": len(misses)
+                    }
+                changes.extend(self._extract_changes_from_log(agent_log))
+                message += f"; {len(agent_occurrences)} file-level deprecations migrated by the agent"
+            
+            return {
+                "success": True,
+                "message": message,
+                "changes": changes,
+                "migration_log": migration_log,
+                "repo_path": repo_path,
+                "cache_hits": cache_hits,
+                "cache_misses": len(misses)
+            }
+            
+        except Exception as e:
+            logger.error(f"Migration failed: {e}")
+            return {
+                "success": False,
+                "message": "Migration failed",
+                "error": str(e),
+                "changes": changes,
+                "migration_log": migration_log,
+                "cache_hits": cache_hits,
+                "cache_misses": len(misses)
+            }
+    
+    @staticmethod
+    def _summarize_occurrences(occurrences: List[Dict]) -> List[Dict]:
+        """Count occurrences per deprecation, in the shape of AnalysisResult.deprecated_patterns."""
+        counts: Dict[str, int] = {}
+        for occurrence in occurrences:
+            for description in occurrence["descriptions"]:
+                counts[description] = counts.get(description, 0) + 1
+        return [{"description": description, "count": count} for description, count in counts.items()]
+    
+    async def _run_session(
+        self,
+        prompt: str,
+        model: str,
+        timeout: int,
+        migration_log: List[Dict]
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Send a prompt to a new Copilot session and wait for it to go idle.
+        
+        Returns:
+            Tuple of (final assistant message, error message or None)
+        """
+        session = await self.client.create_session({"model": model})
+        
+        response_content = None
+        done = asyncio.Event()
+        
+        def on_event(event):
+            nonlocal response_content
+            
+            try:
+                event_type = event.type.value if hasattr(event.type, 'value') else str(event.type)
+            except AttributeError:
+                event_type = "unknown"
+                logger.warning(f"Event has unexpected structure: {event}")
+            
+            if event_type == "assistant.reasoning":
+                migration_log.append({
+                    "type": "reasoning",
+                    "content": event.data.content
+                })
+                logger.info(f"Agent reasoning: {event.data.content}")
+                
+            elif event_type == "tool.execution_start":
+                migration_log.append({
+                    "type": "tool",
+                    "tool_name": event.data.tool_name
+                })
+                logger.info(f"Executing tool: {event.data.tool_name}")
+                
+            elif event_type == "assistant.message":
+                response_content = event.data.content
+                migration_log.append({
+                    "type": "message",
+                    "content": event.data.content
+                })
+                
+            elif event_type == "session.idle":
+                done.set()
+        
+        session.on(on_event)
+        
+        # Send migration request
+        await session.send({"prompt": prompt})
+        
+        # Wait for completion (with timeout)
+        try:
+            await asyncio.wait_for(done.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"Migration timed out after {timeout} seconds")
+            await session.destroy()
+            return None, f"Migration timed out after {timeout} seconds"
+        
+        # Clean up session
+        await session.destroy()
+        
+        return response_content, None
+    
+    def _build_migration_prompt(
+        self,
+        repo_path: str,
+        deprecations: List[Dict],
+        files: Optional[List[str]] = None
+    ) -> str:
+        """Build a prompt for the migration agent, optionally limited to some files."""
         
         deprecation_summary = "\n".join([
             f"- {dep['description']}: {dep['count']} occurrences"
             for dep in deprecations
         ])
+        if files:
+            deprecation_summary += "\n\nOnly these files contain them:\n" + "\n".join(
+                f"- {file}" for file in files
+            )
         
         prompt = f"""You are a code migration expert. I need you to fix deprecated code in a repository.
 
@@ -197,20 +403,186 @@ Please:
 5. Verify the changes don't break the code
 
 For Flutter/Dart deprecations, use these mappings:
-- headline1-6 → displayLarge, displayMedium, displaySmall, headlineLarge, headlineMedium, headlineSmall
-- bodyText1-2 → bodyLarge, bodyMedium
-- subtitle1-2 → titleLarge, titleMedium
-- caption → bodySmall
-- ButtonStyle.primary → backgroundColor
-- ButtonStyle.onPrimary → foregroundColor
-- WillPopScope → PopScope
-- ButtonBar → OverflowBar
-- AppBar.brightness → systemOverlayStyle
+{FLUTTER_MIGRATION_MAPPINGS}
 
 After making changes, provide a summary of what was fixed."""
         
         return prompt
     
+    def _build_rewrite_prompt(self, misses: Dict[str, Dict]) -> str:
+        """Build a prompt asking the agent to rewrite individual snippets."""
+        
+        snippet_list = "\n\n".join([
+            f"[{key}] ({'; '.join(occurrence['descriptions'])})\n```\n{occurrence['snippet'].strip()}\n```"
+            for key, occurrence in misses.items()
+        ])
+        
+        prompt = f"""You are a code migration expert. Rewrite each deprecated snippet below to its modern equivalent.
+
+Each snippet is preceded by its id and the deprecations it contains. A snippet is either a single
+source line or a whole widget constructor call; in a call, child widgets are replaced by placeholders
+such as {hole_placeholder(0)}.
+Do not edit any files. Preserve the surrounding syntax (open brackets, trailing commas) so the
+rewrite can replace the original snippet in place, and keep every placeholder exactly once, in order.
+
+Snippets:
+{snippet_list}
+
+For Flutter/Dart deprecations, use these mappings:
+{FLUTTER_MIGRATION_MAPPINGS}
+
+Reply with only a JSON array of objects of the form {{"id": "<id>", "rewrite": "<rewritten snippet>"}}."""
+        
+        return prompt
+    
+    def _parse_rewrites(self, response_content: Optional[str]) -> Dict[str, str]:
+        """Parse the JSON rewrite list returned by the agent."""
+        if not response_content:
+            return {}
+        
+        # The reply may echo "[<id>]" labels or add bracketed text around the JSON,
+        # so decode from each "[" and keep the first complete list of objects
+        decoder = json.JSONDecoder()
+        entries = None
+        for match in re.finditer(r'\[', response_content):
+            try:
+                value, _ = decoder.raw_decode(response_content, match.start())
+            except json.JSONDecodeError:
+                continue
+            if isinstance(value, list) and all(isinstance(entry, dict) for entry in value):
+                entries = value
+                break
+        
+        if entries is None:
+            logger.warning("Agent response did not contain a rewrite list")
+            return {}
+        
+        rewrites = {}
+        for entry in entries:
+            if isinstance(entry, dict) and isinstance(entry.get("rewrite"), str):
+                rewrites[str(entry.get("id"))] = entry["rewrite"].strip()
+        return rewrites
+    
+    @staticmethod
+    def _is_valid_rewrite(occurrence: Dict, rewrite: str) -> bool:
+        """
+        Reject rewrites that would damage the file or poison the cache.
+        
+        A rewrite must be non-empty, differ from the snippet, no longer match
+        any of the snippet's rules and keep the placeholders of a block.
+        """
+        if not rewrite.strip() or rewrite.strip() == occurrence["snippet"].strip():
+            return False
+        if any(re.search(pattern, rewrite) for pattern in occurrence["patterns"]):
+            return False
+        if occurrence["scope"] == BLOCK_SCOPE:
+            positions = []
+            for number in range(len(occurrence["holes"])):
+                placeholder = hole_placeholder(number)
+                if rewrite.count(placeholder) != 1:
+                    return False
+                positions.append(rewrite.index(placeholder))
+            if positions != sorted(positions):
+                return False
+        return True
+    
+    @staticmethod
+    def _occurrence_edits(
+        occurrence: Dict,
+        rewrite: str,
+        text: str,
+        line_spans: List[Tuple[int, int]]
+    ) -> List[Tuple[int, int, str]]:
+        """
+        Turn a rewrite into (start, end, replacement) edits of a file's text.
+        
+        Returns an empty list if the occurrence no longer matches the text.
+        Block edits leave the child arguments (the holes) untouched.
+        """
+        if occurrence["scope"] != BLOCK_SCOPE:
+            index = occurrence["line"] - 1
+            if index >= len(line_spans):
+                return []
+            start, end = line_spans[index]
+            body = text[start:end]
+            if body != occurrence["snippet"]:
+                return []
+            indent = body[:len(body) - len(body.lstrip())]
+            return [(start, end, indent + rewrite)]
+        
+        if text[occurrence["start"]:occurrence["end"]] != occurrence["source"]:
+            return []
+        # Re-indent the rewrite to the block's base indentation, then cut it at the holes
+        indent = occurrence["indent"]
+        rewrite = "\n".join(
+            indent + line if position and line else line
+            for position, line in enumerate(rewrite.split("\n"))
+        )
+        edits = []
+        position = occurrence["start"]
+        for number, (hole_start, hole_end) in enumerate(occurrence["holes"]):
+            piece, rewrite = rewrite.split(hole_placeholder(number), 1)
+            edits.append((position, hole_start, piece))
+            position = hole_end
+        edits.append((position, occurrence["end"], rewrite))
+        return edits
+    
+    def _apply_rewrites(
+        self,
+        repo_path: str,
+        keyed: Dict[str, List[Dict]],
+        rewrites: Dict[str, str]
+    ) -> List[str]:
+        """Replace deprecated lines and blocks in place, keeping indentation and line endings."""
+        by_file: Dict[str, List[Tuple[Dict, str]]] = {}
+        for key, group in keyed.items():
+            if key not in rewrites:
+                continue
+            for occurrence in group:
+                by_file.setdefault(occurrence["file"], []).append((occurrence, rewrites[key]))
+        
+        changes = []
+        for relative_path, edits in by_file.items():
+            file_path = Path(repo_path) / relative_path
+            try:
+                with open(file_path, 'r', encoding='utf-8', newline='') as f:
+                    raw = f.read()
+            except (OSError, UnicodeDecodeError) as e:
+                logger.warning(f"Skipping {relative_path}: {e}")
+                continue
+            
+            # Offsets from the analyzer refer to the text with universal newlines
+            crlf = '\r\n' in raw
+            text = raw.replace('\r\n', '\n') if crlf else raw
+            line_spans = []
+            offset = 0
+            for line in text.splitlines(keepends=True):
+                body = line.rstrip('\r\n')
+                line_spans.append((offset, offset + len(body)))
+                offset += len(line)
+            
+            # Occurrences are applied whole or not at all; one overlapping an
+            # earlier one (e.g. a line inside a block) is left for the next run
+            accepted: List[Tuple[int, int, str]] = []
+            for occurrence, rewrite in sorted(edits, key=lambda edit: (edit[0]["line"], edit[0]["scope"])):
+                occurrence_edits = self._occurrence_edits(occurrence, rewrite, text, line_spans)
+                if not occurrence_edits or any(
+                    start < other_end and other_start < end
+                    for start, end, _ in occurrence_edits
+                    for other_start, other_end, _ in accepted
+                ):
+                    continue
+                accepted.extend(occurrence_edits)
+                changes.append(f"{relative_path}:{occurrence['line']}: {', '.join(occurrence['descriptions'])}")
+            
+            if accepted:
+                for start, end, replacement in sorted(accepted, reverse=True):
+                    text = text[:start] + replacement + text[end:]
+                with open(file_path, 'w', encoding='utf-8', newline='') as f:
+                    f.write(text.replace('\n', '\r\n') if crlf else text)
+        
+        return changes
+    
     def _extract_changes_from_log(self, migration_log: List[Dict]) -> List[str]:
         """Extract file changes from the migration log."""
         changes = []
@@ -0,0 +1,117 @@
+"""
+Request and response models for the Repository Outdated Score API.
+"""
+
+from typing import Dict, List, Literal, Optional
+from pydantic import BaseModel, Field
+
+from config import DEFAULT_MODEL
+
+
+class RepositoryRequest(BaseModel):
+    """Request model for repository analysis."""
+    path: str = Field(..., description="Absolute path to the repository to analyze")
+    ref: Optional[str] = Field(None, description="Branch, tag or commit to analyze from the git object database instead of the working tree")
+    mode: Literal["full", "estimate"] = Field("full", description="'estimate' samples files and extrapolates the score")
+    deadline_ms: Optional[int] = Field(None, gt=0, description="Time budget for estimate mode, in milliseconds")
+    sample_fraction: Optional[float] = Field(None, gt=0, le=1, description="Fraction of files to sample in estimate mode")
+    rollup: bool = Field(False, description="Also score every package (pubspec.yaml) and directory (full mode only)")
+
+
+class DeprecationPattern(BaseModel):
+    """Model for a deprecated code pattern."""
+    pattern: str
+    description: str
+    count: int
+
+
+class ConfidenceInterval(BaseModel):
+    """Confidence bounds of an estimated analysis."""
+    confidence_level: float
+    total_deprecations_low: float
+    total_deprecations_high: float
+    outdated_score_low: float
+    outdated_score_high: float
+
+
+class PackageScore(BaseModel):
+    """Outdated score of a package, over the files whose nearest package root it is."""
+    path: str
+    total_files_analyzed: int
+    total_deprecations: int
+    outdated_score: float
+    severity: str
+
+
+class DirectoryScore(BaseModel):
+    """Outdated score of a directory, over every file below it."""
+    path: str
+    is_package: bool
+    total_files_analyzed: int
+    total_deprecations: int
+    outdated_score: float
+    severity: str
+    children: List["DirectoryScore"] = []
+
+
+class AnalysisResult(BaseModel):
+    """Result of repository analysis."""
+    repository_path: str
+    ref: Optional[str] = None
+    commit: Optional[str] = None
+    total_files_analyzed: int
+    deprecated_patterns: List[DeprecationPattern]
+    total_deprecations: int
+    outdated_score: float
+    severity: str
+    recommendations: List[str]
+    approximate: bool = False
+    files_sampled: Optional[int] = None
+    deadline_reached: Optional[bool] = None
+    confidence_interval: Optional[ConfidenceInterval] = None
+    packages: Optional[List[PackageScore]] = None
+    directory_tree: Optional[DirectoryScore] = None
+
+
+class MigrationRequest(BaseModel):
+    """Request model for repository migration."""
+    path: str = Field(..., description="Absolute path to the repository to migrate")
+    model: Optional[str] = Field(DEFAULT_MODEL, description="LLM model to use for migration")
+
+
+class MigrationResult(BaseModel):
+    """Result of repository migration."""
+    success: bool
+    message: str
+    repo_path: Optional[str] = None
+    changes: List[str]
+    migration_log: Optional[List[dict]] = None
+    error: Optional[str] = None
+    cache_hits: int = 0
+    cache_misses: int = 0
+
+
+class HistoryRequest(BaseModel):
+    """Request model for historical outdated-score backfill."""
+    path: str = Field(..., description="Absolute path to a local git repository")
+    ref: str = Field("HEAD", description="Branch, tag or commit whose history is scored")
+    max_commits: int = Field(1000, ge=1, description="Number of most recent first-parent commits to score")
+
+
+class HistoryPoint(BaseModel):
+    """Outdated score of a single commit."""
+    commit: str
+    date: str
+    outdated_score: float
+    total_deprecations: int
+    total_files_analyzed: int
+    pattern_counts: Dict[str, int]
+
+
+class HistoryResult(BaseModel):
+    """Outdated score time series, oldest commit first."""
+    repository_path: str
+    ref: str
+    commits_analyzed: int
+    unique_blobs_scanned: int
+    history: List[HistoryPoint]
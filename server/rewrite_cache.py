@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Rewrite Cache
+Persistent, content-addressed store of agent rewrites for deprecated snippets.
+"""
+
+import hashlib
+
+from config import REWRITE_CACHE_PATH, REWRITE_CACHE_MAX_ENTRIES
+from sqlite_cache import SqliteLRUCache
+
+
+class RewriteCache(SqliteLRUCache):
+    """SQLite-backed LRU cache of snippet rewrites keyed on (snippet, rule, model)."""
+
+    # Schema of the caches written before SqliteLRUCache, so their rewrites stay usable
+    TABLE = "rewrites"
+    VALUE_COLUMN = "rewrite"
+
+    def __init__(
+        self,
+        path: str = REWRITE_CACHE_PATH,
+        max_entries: int = REWRITE_CACHE_MAX_ENTRIES
+    ):
+        """Open (or create) the cache database at the given path."""
+        super().__init__(path, max_entries)
+
+    @staticmethod
+    def normalize_snippet(snippet: str) -> str:
+        """
+        Strip leading and trailing whitespace so indentation differences share a key.
+
+        Inner whitespace is kept as is: it can sit inside string literals or
+        comments, and the cached line is pasted over every snippet with the key.
+        """
+        return snippet.strip()
+
+    @classmethod
+    def make_key(cls, snippet: str, rule: str, model: str) -> str:
+        """Build the content-addressed key for a snippet, rule and model."""
+        material = "\0".join([cls.normalize_snippet(snippet), rule, model])
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
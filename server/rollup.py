@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Score Rollup
+Aggregates per-file deprecation totals into package and directory totals.
+"""
+
+from pathlib import PurePath
+from typing import Dict, Iterable, List
+
+
+class ScoreRollup:
+    """Accumulates file totals into their nearest package and every ancestor directory."""
+
+    ROOT = "."
+
+    def __init__(self, package_roots: Iterable[str]):
+        """
+        Args:
+            package_roots: Repository-relative directories containing a package
+                manifest, with "." for the repository root
+        """
+        self.package_roots = set(package_roots)
+        # path -> [files, deprecations]
+        self.directories: Dict[str, List[int]] = {}
+        self.packages: Dict[str, List[int]] = {}
+
+    @classmethod
+    def ancestors(cls, relative_path: str) -> List[str]:
+        """Directories containing a file, from the repository root down."""
+        parts = PurePath(relative_path).parts[:-1]
+        return [cls.ROOT] + ["/".join(parts[:depth]) for depth in range(1, len(parts) + 1)]
+
+    @classmethod
+    def parent(cls, directory: str) -> str:
+        """Parent of a repository-relative directory."""
+        return directory.rsplit("/", 1)[0] if "/" in directory else cls.ROOT
+
+    def add_file(self, relative_path: str, deprecations: int):
+        """Attribute a file's deprecations to its ancestors and nearest package."""
+        ancestors = self.ancestors(relative_path)
+        for directory in ancestors:
+            totals = self.directories.setdefault(directory, [0, 0])
+            totals[0] += 1
+            totals[1] += deprecations
+
+        for directory in reversed(ancestors):
+            if directory in self.package_roots:
+                totals = self.packages.setdefault(directory, [0, 0])
+                totals[0] += 1
+                totals[1] += deprecations
+                break
+
+    def children(self) -> Dict[str, List[str]]:
+        """Map each directory to its direct subdirectories that contain code files."""
+        children: Dict[str, List[str]] = {directory: [] for directory in self.directories}
+        for directory in sorted(self.directories):
+            if directory != self.ROOT:
+                children[self.parent(directory)].append(directory)
+        return children
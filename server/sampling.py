@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Stratified Sampling
+Helpers for estimating deprecation totals from a sample of a repository's files.
+"""
+
+import bisect
+import math
+import random
+from pathlib import Path
+from typing import Callable, Dict, Hashable, List, NamedTuple, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+# Upper bounds (bytes) of the file size strata; larger files fall in a final stratum
+SIZE_BUCKETS = [1024, 4096, 16384, 65536]
+
+# Directory depth used to group files into strata
+STRATUM_DIRECTORY_DEPTH = 2
+
+# z-score of the two-sided 95% confidence interval
+Z_95 = 1.96
+
+
+class StratifiedEstimate(NamedTuple):
+    """Extrapolated totals and their confidence interval."""
+    pattern_totals: List[float]
+    total: float
+    low: float
+    high: float
+
+
+def stratum_key(relative_path: str, size: int) -> Tuple[str, int]:
+    """Stratum of a file: its leading directories and its size bucket."""
+    parts = Path(relative_path).parts[:-1]
+    directory = "/".join(parts[:STRATUM_DIRECTORY_DEPTH]) or "."
+    return directory, bisect.bisect_right(SIZE_BUCKETS, size)
+
+
+def sampling_order(items: Sequence[T], key: Callable[[T], Hashable], seed: int = 0) -> List[T]:
+    """
+    Order items so that every prefix is a proportionally stratified random sample.
+
+    Each stratum is shuffled and its k-th member gets priority (k + u) / size with
+    u uniform in [0, 1); sorting by priority interleaves strata in proportion to
+    their size, so sampling can stop at any point (e.g. a deadline) and still
+    cover every stratum fairly.
+    """
+    rng = random.Random(seed)
+    strata: Dict[Hashable, List[T]] = {}
+    for item in items:
+        strata.setdefault(key(item), []).append(item)
+
+    prioritized = []
+    for members in strata.values():
+        rng.shuffle(members)
+        for k, member in enumerate(members):
+            prioritized.append(((k + rng.random()) / len(members), member))
+
+    prioritized.sort(key=lambda entry: entry[0])
+    return [member for _, member in prioritized]
+
+
+def _mean(values: Sequence[float]) -> float:
+    return sum(values) / len(values)
+
+
+def _sample_variance(values: Sequence[float]) -> float:
+    if len(values) < 2:
+        return 0.0
+    mean = _mean(values)
+    return sum((value - mean) ** 2 for value in values) / (len(values) - 1)
+
+
+def stratified_estimate(
+    population: Dict[Hashable, int],
+    samples: Dict[Hashable, List[List[int]]],
+    num_patterns: int,
+    z: float = Z_95
+) -> StratifiedEstimate:
+    """
+    Extrapolate per-pattern and overall totals from stratified samples.
+
+    Args:
+        population: Number of files in each stratum
+        samples: Per-pattern counts of every sampled file, by stratum
+        num_patterns: Number of patterns counted per file
+        z: z-score of the confidence interval
+
+    Returns:
+        StratifiedEstimate with the interval clamped to the counts actually observed
+    """
+    sampled = [counts for stratum in samples.values() for counts in stratum]
+    if not sampled:
+        raise ValueError("Cannot estimate without any sampled files")
+
+    # Pooled statistics stand in for strata with too few samples
+    pooled_totals = [sum(counts) for counts in sampled]
+    pooled_variance = _sample_variance(pooled_totals)
+    pooled_pattern_means = [_mean([counts[i] for counts in sampled]) for i in range(num_patterns)]
+
+    pattern_totals = [0.0] * num_patterns
+    variance = 0.0
+    unsampled_size = 0
+    for stratum, size in population.items():
+        stratum_samples = samples.get(stratum, [])
+        n = len(stratum_samples)
+
+        if n == 0:
+            # Stratum not reached before the deadline: extrapolate from the pooled sample
+            for i in range(num_patterns):
+                pattern_totals[i] += size * pooled_pattern_means[i]
+            unsampled_size += size
+            continue
+
+        for i in range(num_patterns):
+            pattern_totals[i] += size * _mean([counts[i] for counts in stratum_samples])
+        stratum_variance = (
+            _sample_variance([sum(counts) for counts in stratum_samples]) if n > 1 else pooled_variance
+        )
+        # Finite population correction: fully sampled strata contribute no variance
+        variance += size ** 2 * (1 - n / size) * stratum_variance / n
+
+    # Unsampled strata share one pooled mean, so their errors add up rather than
+    # averaging out: they count as a single stratum of their combined size
+    variance += unsampled_size ** 2 * pooled_variance / len(sampled)
+
+    total = sum(pattern_totals)
+    half_width = z * math.sqrt(variance)
+    return StratifiedEstimate(
+        pattern_totals=pattern_totals,
+        total=total,
+        low=max(float(sum(pooled_totals)), total - half_width),
+        high=total + half_width
+    )
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+SQLite LRU Cache
+Persistent key/value store with least-recently-used eviction, shared by the caches.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Keys per statement, below SQLite's bound-parameter limit
+BATCH_SIZE = 500
+
+
+class SqliteLRUCache:
+    """SQLite-backed string cache evicting least recently used entries beyond a limit."""
+
+    # Table holding this cache's entries; subclasses sharing a file use distinct tables
+    TABLE = "entries"
+    # Column holding the cached values
+    VALUE_COLUMN = "value"
+
+    def __init__(self, path: str, max_entries: int):
+        """Open (or create) the cache database at the given path."""
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            f"""CREATE TABLE IF NOT EXISTS {self.TABLE} (
+                key TEXT PRIMARY KEY,
+                {self.VALUE_COLUMN} TEXT NOT NULL,
+                last_used REAL NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            f"CREATE INDEX IF NOT EXISTS {self.TABLE}_last_used ON {self.TABLE} (last_used)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached value for a key, marking it as recently used."""
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        """Return the cached values of every key that is present, marking them as recently used."""
+        keys = list(keys)
+        found: Dict[str, str] = {}
+        with self._lock:
+            for start in range(0, len(keys), BATCH_SIZE):
+                batch = keys[start:start + BATCH_SIZE]
+                placeholders = ",".join("?" * len(batch))
+                found.update(self._conn.execute(
+                    f"SELECT key, {self.VALUE_COLUMN} FROM {self.TABLE} WHERE key IN ({placeholders})", batch
+                ).fetchall())
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    f"UPDATE {self.TABLE} SET last_used = ? WHERE key = ?",
+                    [(now, key) for key in found]
+                )
+                self._conn.commit()
+        return found
+
+    def put(self, key: str, value: str):
+        """Store a value and evict the least recently used entries if full."""
+        self.put_many([(key, value)])
+
+    def put_many(self, items: List[Tuple[str, str]]):
+        """Store several values in one transaction, then evict once."""
+        if not items:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO {self.TABLE} (key, {self.VALUE_COLUMN}, last_used) VALUES (?, ?, ?)",
+                [(key, value, now) for key, value in items]
+            )
+            self._conn.execute(
+                f"""DELETE FROM {self.TABLE} WHERE key IN (
+                    SELECT key FROM {self.TABLE} ORDER BY last_used DESC LIMIT -1 OFFSET ?
+                )""",
+                (self.max_entries,)
+            )
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.TABLE}").fetchone()[0]
+
+    def close(self):
+        """Close the underlying database connection."""
+        with self._lock:
+            try:
+                self._conn.close()
+            except Exception as e:
+                logger.error(f"Error closing {type(self).__name__}: {e}")
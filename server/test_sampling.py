@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Tests for the stratified sampling helpers of estimate mode.
+
+Usage:
+    cd server
+    python -m unittest test_sampling
+"""
+
+import random
+import unittest
+
+from config import ESTIMATE_MIN_SAMPLE_FILES
+from sampling import sampling_order, stratified_estimate
+
+
+def synthetic_repository(seed: int, num_files: int = 5000, num_strata: int = 200):
+    """Files as (stratum, deprecation count) pairs, with per-stratum deprecation rates."""
+    rng = random.Random(seed)
+    rates = [rng.expovariate(1.0) for _ in range(num_strata)]
+    files = []
+    for _ in range(num_files):
+        stratum = rng.randrange(num_strata)
+        files.append((stratum, sum(rng.random() < rates[stratum] / 4 for _ in range(4))))
+    return files
+
+
+def estimate_prefix(files, sample_size: int, seed: int):
+    """Estimate from the first `sample_size` files of the sampling order, like a passed deadline."""
+    order = sampling_order(files, key=lambda file: file[0], seed=seed)
+    population = {}
+    for stratum, _ in files:
+        population[stratum] = population.get(stratum, 0) + 1
+    samples = {}
+    for stratum, count in order[:sample_size]:
+        samples.setdefault(stratum, []).append([count])
+    return stratified_estimate(population, samples, num_patterns=1)
+
+
+class StratifiedEstimateTest(unittest.TestCase):
+
+    def test_full_sample_is_exact(self):
+        files = synthetic_repository(seed=0, num_files=500, num_strata=20)
+        estimate = estimate_prefix(files, len(files), seed=0)
+        true_total = sum(count for _, count in files)
+        self.assertAlmostEqual(estimate.total, true_total)
+        self.assertAlmostEqual(estimate.low, true_total)
+        self.assertAlmostEqual(estimate.high, true_total)
+
+    def test_interval_coverage_with_minimum_sample(self):
+        # Most strata are unsampled when a deadline stops at the minimum sample;
+        # the 95% interval must still cover the true total nearly as often
+        runs = 100
+        covered = 0
+        for seed in range(runs):
+            files = synthetic_repository(seed)
+            estimate = estimate_prefix(files, ESTIMATE_MIN_SAMPLE_FILES, seed)
+            true_total = sum(count for _, count in files)
+            covered += estimate.low <= true_total <= estimate.high
+        self.assertGreaterEqual(covered / runs, 0.85)
+
+
+if __name__ == "__main__":
+    unittest.main()